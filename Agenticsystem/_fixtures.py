@@ -0,0 +1,38 @@
+"""
+Carbon Pilot - Sample Data
+
+Sample carbon footprint data shared by the demo scripts (run_analysis.py and
+test_analyzer.py).
+"""
+
+# Sample carbon footprint data (example from your calculations)
+SAMPLE_CARBON_DATA = {
+    "products": [
+        {
+            "product_name": "Steel Frame",
+            "material_type": "Steel",
+            "weight_kg": 3000,
+            "emission_factor": 1.85,
+            "total_emissions": 5550
+        },
+        {
+            "product_name": "Plastic Case",
+            "material_type": "Plastic",
+            "weight_kg": 250,
+            "emission_factor": 6.0,
+            "total_emissions": 1500
+        },
+        {
+            "product_name": "Cotton T-Shirt",
+            "material_type": "Cotton",
+            "weight_kg": 200,
+            "emission_factor": 5.3,
+            "total_emissions": 1060
+        }
+    ],
+    "summary": {
+        "total_emissions": 8110,
+        "total_products": 3,
+        "average_emissions_per_product": 2703.33
+    }
+}
@@ -1 +1,16 @@
-from . import agent
\ No newline at end of file
+"""
+Carbon Pilot agent package.
+
+Submodules are imported on first access, so importing the package does not
+load the agent framework or build the agent tree.
+"""
+
+
+def __getattr__(name):
+    if name == "agent":
+        from . import agent
+        return agent
+    if name == "root_agent":
+        from .agent import root_agent
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,141 @@
+"""
+Batch-mode Gemini Model
+
+A Gemini model that sends requests through the Gemini Batch API instead of the
+interactive endpoint. Batch jobs are billed at a discount and amortize per-request
+overhead, at the cost of latency, so this is only meant for offline runs (e.g. a
+nightly job processing many SKU catalogs concurrently).
+
+Requests issued within a short collection window, by any agent using the same model,
+are submitted together as one inline batch job. The job is polled with exponential
+backoff and the responses are handed back to the callers that queued them.
+Inline batch requests are supported by the Gemini Developer API.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import AsyncGenerator
+
+from google.adk.models import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+_TERMINAL_STATES = {
+    types.JobState.JOB_STATE_SUCCEEDED,
+    types.JobState.JOB_STATE_FAILED,
+    types.JobState.JOB_STATE_CANCELLED,
+    types.JobState.JOB_STATE_EXPIRED,
+}
+
+# event loop -> {model name: queue shared by every agent using that model}
+_QUEUES = weakref.WeakKeyDictionary()
+
+
+class _BatchQueue:
+    """Collects requests for one model and submits them as inline batch jobs."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self._pending = []
+        self._flush_handle = None
+        # asyncio only keeps weak references to tasks; running flushes are held here
+        self._tasks = set()
+
+    async def submit(self, request: types.InlinedRequest) -> types.GenerateContentResponse:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((request, future))
+
+        if len(self._pending) >= self.llm.max_batch_size:
+            self._schedule_flush(0)
+        elif self._flush_handle is None:
+            self._schedule_flush(self.llm.batch_window)
+        return await future
+
+    def _schedule_flush(self, delay):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = asyncio.get_running_loop().call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self):
+        batch, self._pending, self._flush_handle = self._pending, [], None
+        if not batch:
+            return
+        try:
+            responses = await self._run_job([request for request, _ in batch]) or []
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), inlined in zip(batch, responses):
+            if future.done():
+                continue
+            if inlined.error:
+                future.set_exception(RuntimeError(f"Batch request failed: {inlined.error.message}"))
+            else:
+                future.set_result(inlined.response)
+        # A job that returns fewer responses than requests must not leave callers waiting
+        for _, future in batch[len(responses):]:
+            if not future.done():
+                future.set_exception(RuntimeError("Batch job returned no response for this request"))
+
+    async def _run_job(self, requests):
+        client = self.llm.api_client
+        job = await client.aio.batches.create(model=self.llm.model, src=requests)
+        logger.info("Submitted batch job %s with %d requests", job.name, len(requests))
+
+        delay = self.llm.poll_interval
+        while job.state not in _TERMINAL_STATES:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.llm.max_poll_interval)
+            job = await client.aio.batches.get(name=job.name)
+
+        if job.state != types.JobState.JOB_STATE_SUCCEEDED:
+            raise RuntimeError(f"Batch job {job.name} finished in state {job.state}")
+        return job.dest.inlined_responses
+
+
+class BatchGemini(Gemini):
+    """
+    Gemini model that routes generate_content through the Batch API.
+
+    Attributes:
+        batch_window: Seconds to wait for more requests before submitting a job
+        max_batch_size: Submit immediately once this many requests are queued
+        poll_interval: Initial delay between job status polls (doubles each poll)
+        max_poll_interval: Upper bound for the poll delay
+    """
+
+    batch_window: float = 2.0
+    max_batch_size: int = 100
+    poll_interval: float = 5.0
+    max_poll_interval: float = 60.0
+
+    def _queue(self) -> _BatchQueue:
+        queues = _QUEUES.setdefault(asyncio.get_running_loop(), {})
+        if self.model not in queues:
+            queues[self.model] = _BatchQueue(self)
+        return queues[self.model]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self._maybe_append_user_content(llm_request)
+        response = await self._queue().submit(
+            types.InlinedRequest(contents=llm_request.contents, config=llm_request.config)
+        )
+        yield LlmResponse.create(response)
@@ -0,0 +1,193 @@
+"""
+Deterministic Impact Categorization
+
+The analyzer's impact categories are a pure threshold function of each product's
+share of total emissions (>40% high, 15-40% medium, <15% low). Instead of having the
+model bucket and copy every row, the rows are parsed from the request, bucketed with
+NumPy, and handed to the model pre-categorized. The model then only writes the
+qualitative fields (per-product summaries, targets, quick wins, patterns), and the
+full AnalysisResults is assembled in Python from both parts.
+
+Requests whose rows cannot be parsed are left untouched and analyzed by the model
+as before.
+"""
+
+import json
+import logging
+import re
+
+import numpy as np
+from google.genai import types
+
+from ._parse import JSONDecodeError, parse
+from .schemas import AnalysisReasoning, AnalysisResults
+
+logger = logging.getLogger(__name__)
+
+# Row labels in the analysis prompt -> ProductAnalysis fields
+ROW_FIELDS = {
+    "Material Type": "material_type",
+    "Emission Factor": "emission_factor",
+    "Total Emissions": "absolute_emissions",
+    "Percentage of Total": "emission_percentage",
+}
+NUMERIC_FIELDS = ("emission_factor", "absolute_emissions", "emission_percentage")
+
+_ROW_LINE_RE = re.compile(r"^\s*-\s*([^:]+):\s*(.*?)\s*$")
+_NUMBER_RE = re.compile(r"-?\d[\d,]*(?:\.\d+)?")
+
+
+def bucket(pct: np.ndarray) -> np.ndarray:
+    """Impact category ('high', 'medium' or 'low') for each emission percentage."""
+    return np.select([pct > 40, pct >= 15], ["high", "medium"], "low")
+
+
+def parse_rows(text):
+    """
+    Extract the product rows from an analysis prompt.
+
+    Rows start with a 'Product: <name>' line followed by '- Label: value' lines;
+    any other line ending in ':' (e.g. 'SUMMARY:') ends the current row.
+
+    Returns:
+        list[dict]: One dict per product with the raw field strings
+    """
+    rows, row = [], None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("Product:"):
+            row = {"product_name": stripped[len("Product:"):].strip()}
+            rows.append(row)
+        elif stripped.endswith(":"):
+            row = None
+        elif row is not None and (match := _ROW_LINE_RE.match(line)) and match[1] in ROW_FIELDS:
+            row[ROW_FIELDS[match[1]]] = match[2]
+    return rows
+
+
+def _to_number(value):
+    match = _NUMBER_RE.search(value or "")
+    return float(match[0].replace(",", "")) if match else None
+
+
+def categorize(rows):
+    """
+    Bucket parsed rows by emission percentage.
+
+    Returns:
+        dict: 'high_impact', 'medium_impact' and 'low_impact' lists of product
+              dicts, plus 'unprocessed_items' for rows with missing or invalid values
+    """
+    products, unprocessed = [], []
+    for row in rows:
+        values = {field: _to_number(row.get(field)) for field in NUMERIC_FIELDS}
+        missing = [field for field, value in values.items() if value is None]
+        if missing or not row.get("material_type"):
+            unprocessed.append({
+                "product_name": row["product_name"],
+                "material_type": row.get("material_type", ""),
+                "error": f"Missing or invalid: {', '.join(missing or ['material_type'])}",
+                "analysis_summary": "The row could not be categorized because required values are missing.",
+            })
+        else:
+            products.append({
+                "product_name": row["product_name"],
+                "material_type": row["material_type"],
+                **values,
+            })
+
+    categorized = {"high_impact": [], "medium_impact": [], "low_impact": []}
+    labels = bucket(np.array([product["emission_percentage"] for product in products], dtype=float))
+    for product, label in zip(products, labels):
+        categorized[f"{label}_impact"].append(product)
+    categorized["unprocessed_items"] = unprocessed
+    return categorized
+
+
+def assemble(categorized, reasoning):
+    """
+    Combine the pre-bucketed rows with the model's qualitative output.
+
+    Args:
+        categorized: Output of categorize()
+        reasoning: The model's AnalysisReasoning output (dict or JSON string)
+
+    Returns:
+        AnalysisResults: The full analysis
+    """
+    try:
+        reasoning = parse(reasoning)
+    except (JSONDecodeError, TypeError):
+        logger.warning("Could not parse the analyzer reasoning; summaries left empty")
+        reasoning = {}
+
+    summaries = {
+        item.get("product_name"): item.get("analysis_summary", "")
+        for item in reasoning.get("product_summaries", [])
+    }
+    return AnalysisResults(
+        **{
+            key: [
+                {**product, "analysis_summary": summaries.get(product["product_name"], "")}
+                for product in categorized[key]
+            ]
+            for key in ("high_impact", "medium_impact", "low_impact")
+        },
+        unprocessed_items=categorized["unprocessed_items"],
+        strategic_targets=reasoning.get("strategic_targets", []),
+        quick_wins=reasoning.get("quick_wins", []),
+        key_patterns=reasoning.get("key_patterns", ""),
+    )
+
+
+class Categorizer:
+    """
+    ADK model callbacks that pre-bucket the request rows for the analyzer.
+
+    Args:
+        instruction: System instruction used when the rows are pre-bucketed; it
+            should ask only for the AnalysisReasoning fields
+    """
+
+    def __init__(self, instruction):
+        self.instruction = instruction
+        self._pending = {}  # invocation id -> categorize() output
+
+    def active(self, callback_context):
+        """True if the rows of this invocation were pre-bucketed and await the reasoning."""
+        return callback_context.invocation_id in self._pending
+
+    def before_model_callback(self, callback_context, llm_request):
+        """ADK callback: bucket the rows and ask the model for the reasoning only."""
+        if not llm_request.contents:
+            return None
+        text = "\n".join(
+            part.text for part in (llm_request.contents[-1].parts or []) if part.text
+        )
+        rows = parse_rows(text)
+        if not rows:
+            return None
+
+        categorized = categorize(rows)
+        self._pending[callback_context.invocation_id] = categorized
+        llm_request.config.system_instruction = self.instruction
+        llm_request.set_output_schema(AnalysisReasoning)
+        llm_request.contents[-1].parts.append(types.Part.from_text(
+            text="PRE-BUCKETED ROWS:\n" + json.dumps(categorized)
+        ))
+        return None
+
+    def after_model_callback(self, callback_context, llm_response):
+        """ADK callback: replace the reasoning with the assembled AnalysisResults."""
+        if llm_response.partial:
+            return None
+        categorized = self._pending.pop(callback_context.invocation_id, None)
+        if categorized is None or not llm_response.content:
+            return None
+        reasoning = "".join(
+            part.text for part in (llm_response.content.parts or []) if part.text
+        )
+        analysis = assemble(categorized, reasoning or "{}")
+        return llm_response.model_copy(update={
+            "content": types.ModelContent(parts=[types.Part.from_text(text=analysis.model_dump_json())])
+        })
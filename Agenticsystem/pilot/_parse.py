@@ -0,0 +1,81 @@
+"""
+Parsing helpers for agent JSON output.
+
+The agents return JSON (enforced through their response schemas), but text taken
+from events or older sessions may still be wrapped in markdown code fences. These
+helpers strip the fences with one precompiled regex and parse with orjson when it
+is installed, falling back to the standard library json module. For free-form text
+with prose around the JSON, extract_object() finds the first complete object.
+"""
+
+import re
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    import json
+
+    _loads = json.loads
+    JSONDecodeError = json.JSONDecodeError
+
+CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.M)
+
+
+def parse(value):
+    """
+    Parse an agent output into a dict.
+
+    Args:
+        value: Agent output from session state - a dict (when the agent has an
+               output schema) or a JSON string, optionally wrapped in code fences
+
+    Returns:
+        dict: The parsed output
+
+    Raises:
+        JSONDecodeError: If the text is not valid JSON
+    """
+    if isinstance(value, dict):
+        return value
+    return _loads(CODE_FENCE_RE.sub("", value.strip()))
+
+
+def extract_object(text):
+    """
+    Find the first complete JSON object in free-form text.
+
+    Walks the text once from the first '{', tracking brace depth outside of
+    string literals, so nested objects and trailing prose are handled.
+
+    Args:
+        text: Text that contains a JSON object somewhere
+
+    Returns:
+        str | None: The object's source text, or None if there is no complete object
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    depth, in_string, escaped = 0, False, False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
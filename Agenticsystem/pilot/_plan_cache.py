@@ -0,0 +1,107 @@
+"""
+Optimizer Plan-Template Cache
+
+Different carbon inputs often produce structurally identical optimizer plans: the same
+material categories in the same impact buckets lead to the same strategy templates.
+This cache keys a previous plan on the categorical signature of the analysis (sorted
+(material_type, impact bucket) pairs) and, on a hit, hands that plan to the model as a
+skeleton to adapt. The model then mostly copies structure instead of generating every
+strategy from scratch.
+"""
+
+import logging
+from collections import OrderedDict
+
+from ._parse import JSONDecodeError, parse
+
+logger = logging.getLogger(__name__)
+
+IMPACT_BUCKETS = ("high_impact", "medium_impact")
+
+SKELETON_INSTRUCTION = """PLAN SKELETON:
+A previous analysis with the same materials in the same impact categories produced the plan below.
+Reuse its structure and strategy types. Update product names, materials, specific actions and
+expected outcomes so they match the current analysis exactly.
+"""
+
+
+def plan_signature(analysis):
+    """
+    Categorical signature of an analysis: sorted (material_type, bucket) pairs.
+
+    Args:
+        analysis: The analyzer output (dict or JSON string)
+
+    Returns:
+        tuple: The signature, empty if there is nothing to optimize
+    """
+    analysis = parse(analysis)
+    return tuple(sorted(
+        (product["material_type"], bucket)
+        for bucket in IMPACT_BUCKETS
+        for product in analysis.get(bucket, [])
+    ))
+
+
+class PlanTemplateCache:
+    """
+    LRU cache mapping (agent name, plan signature) to the last plan produced.
+
+    Args:
+        max_entries: Maximum number of cached plans
+        state_key: Session state key holding the analyzer output
+    """
+
+    def __init__(self, max_entries=128, state_key="analysis_results"):
+        self.max_entries = max_entries
+        self.state_key = state_key
+        self._plans = OrderedDict()
+        # (invocation id, agent name) -> cache key; the parallel angle agents share
+        # one invocation id, so the agent name keeps their pending keys apart
+        self._pending = {}
+
+    def get(self, key):
+        if key not in self._plans:
+            return None
+        self._plans.move_to_end(key)
+        return self._plans[key]
+
+    def put(self, key, plan):
+        self._plans[key] = plan
+        self._plans.move_to_end(key)
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+
+    def before_model_callback(self, callback_context, llm_request):
+        """ADK callback: attach the cached skeleton for this analysis, if any."""
+        analysis = callback_context.state.get(self.state_key)
+        if analysis is None:
+            return None
+        try:
+            signature = plan_signature(analysis)
+        except (JSONDecodeError, KeyError, TypeError, AttributeError):
+            return None
+        if not signature:
+            return None
+
+        key = (callback_context.agent_name, signature)
+        self._pending[(callback_context.invocation_id, callback_context.agent_name)] = key
+        skeleton = self.get(key)
+        if skeleton is not None:
+            logger.info("Plan template hit for %s", callback_context.agent_name)
+            llm_request.append_instructions([SKELETON_INSTRUCTION + skeleton])
+        return None
+
+    def after_model_callback(self, callback_context, llm_response):
+        """ADK callback: remember the final plan under the analysis signature."""
+        if llm_response.partial:
+            return None
+        key = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if key is None or not llm_response.content:
+            return None
+        plan = "".join(
+            part.text for part in (llm_response.content.parts or []) if part.text
+        )
+        if plan:
+            self.put(key, plan)
+        return None
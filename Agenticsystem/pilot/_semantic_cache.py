@@ -0,0 +1,241 @@
+"""
+Semantic Response Cache
+
+Caches LLM responses keyed by the embedding of the request's user data, so that
+near-duplicate inputs (e.g. the same SKU catalog for a different month) are served
+without a model round-trip.
+
+Entries are partitioned by model name and system instruction, so a cached answer is
+only reused for the same agent configuration, and optionally by a scope derived from
+the text (e.g. the set of product names) that must match exactly. Lookups first try an
+exact match on the request text and only then fall back to cosine similarity over
+embeddings. The API mirrors GPTCache's similar cache: get() / put(), plus ADK model
+callbacks.
+
+The ADK callbacks run synchronously on the event loop, so they never call the
+embedding service themselves: the caller awaits prefetch() for the input ahead of
+the lookup, and embeddings of newly stored entries are computed in the background.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+from collections import OrderedDict
+
+from google.adk.models.llm_response import LlmResponse
+from google.genai import Client, types
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-004"
+SIMILARITY_THRESHOLD = 0.92
+
+
+def content_text(content):
+    """Concatenate the text parts of a Content."""
+    return "\n".join(part.text for part in (content.parts or []) if part.text)
+
+
+def _lookup_text(callback_context, llm_request):
+    """The user data of the request: the invocation's user message if there is one."""
+    if callback_context.user_content is not None:
+        return content_text(callback_context.user_content)
+    return "\n".join(content_text(content) for content in llm_request.contents)
+
+
+def _namespace(llm_request, scope=None):
+    """Partition key: model name plus a digest of the system instruction and scope."""
+    digest = hashlib.sha256(str(llm_request.config.system_instruction or "").encode())
+    if scope is not None:
+        digest.update(repr(scope).encode())
+    return f"{llm_request.model}:{digest.hexdigest()}"
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _normalize(vector):
+    norm = math.sqrt(sum(v * v for v in vector))
+    return tuple(v / norm for v in vector) if norm else tuple(vector)
+
+
+class SemanticCache:
+    """
+    In-memory semantic cache for LLM responses.
+
+    Args:
+        threshold: Minimum cosine similarity for a semantic hit
+        max_entries: Maximum number of cached responses (least recently used are evicted)
+        embedding_model: Embedding model used for the similarity lookup
+        scope: Optional function of the lookup text returning a hashable value that
+            must match exactly for any hit (None entries are never cached)
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_entries=256,
+                 embedding_model=EMBEDDING_MODEL, scope=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.embedding_model = embedding_model
+        self.scope = scope
+        self._entries = OrderedDict()  # (namespace, text digest) -> [embedding, response]
+        self._pending = {}  # invocation id -> (namespace, text)
+        self._embeddings = OrderedDict()  # text digest -> embedding, last 32 texts
+        self._embeddings_lock = threading.Lock()
+        self._tasks = {}  # text digest -> background embedding task
+        self._client = None
+
+    def _embed_uncached(self, text):
+        if self._client is None:
+            self._client = Client()
+        response = self._client.models.embed_content(
+            model=self.embedding_model, contents=text
+        )
+        return _normalize(response.embeddings[0].values)
+
+    def _cached_embedding(self, text):
+        with self._embeddings_lock:
+            return self._embeddings.get(_digest(text))
+
+    def embed(self, text):
+        """
+        Embed the text (blocking) and memoize the result.
+
+        Returns:
+            tuple | None: The normalized embedding, or None if the embedding service is unavailable
+        """
+        embedding = self._cached_embedding(text)
+        if embedding is not None:
+            return embedding
+        try:
+            embedding = self._embed_uncached(text)
+        except Exception as e:
+            logger.warning("Semantic cache embedding failed: %s", e)
+            return None
+        with self._embeddings_lock:
+            self._embeddings[_digest(text)] = embedding
+            while len(self._embeddings) > 32:
+                self._embeddings.popitem(last=False)
+        return embedding
+
+    async def prefetch(self, text):
+        """
+        Embed the text in a worker thread so the callbacks find it memoized.
+
+        Awaited before the model call whose lookup needs it; when the cache is
+        empty there is nothing to compare against, so the embedding is only
+        started in the background for the entry put() will store.
+        """
+        if self._cached_embedding(text) is not None:
+            return
+        if not self._entries:
+            self._embed_in_background(text)
+            return
+        await asyncio.shield(self._embed_in_background(text))
+
+    def _embed_in_background(self, text, entry_key=None):
+        """
+        Start (or join) a worker-thread embedding of the text.
+
+        When entry_key is given, the embedding is stored on that entry once ready.
+        Returns the task, or None outside a running event loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        digest = _digest(text)
+        task = self._tasks.get(digest)
+        if task is None:
+            task = loop.create_task(asyncio.to_thread(self.embed, text))
+            self._tasks[digest] = task
+            task.add_done_callback(lambda _: self._tasks.pop(digest, None))
+        if entry_key is not None:
+            task.add_done_callback(lambda done: self._set_embedding(entry_key, done))
+        return task
+
+    def _set_embedding(self, entry_key, task):
+        entry = self._entries.get(entry_key)
+        if entry is not None and not task.cancelled() and task.exception() is None:
+            entry[0] = task.result()
+
+    def get(self, namespace, text):
+        """
+        Look up a cached response for the given request text.
+
+        The semantic fallback only uses an embedding that is already memoized
+        (see prefetch()); it never calls the embedding service.
+
+        Returns:
+            str | None: The cached response text, or None on a miss
+        """
+        key = (namespace, _digest(text))
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key][1]
+
+        candidates = [
+            (entry_key, entry) for entry_key, entry in self._entries.items()
+            if entry_key[0] == namespace and entry[0] is not None
+        ]
+        if not candidates:
+            return None
+
+        embedding = self._cached_embedding(text)
+        if embedding is None:
+            logger.debug("Semantic cache lookup without a prefetched embedding")
+            return None
+
+        best_key, best_score = None, self.threshold
+        for entry_key, (entry_embedding, _) in candidates:
+            score = sum(a * b for a, b in zip(embedding, entry_embedding))
+            if score >= best_score:
+                best_key, best_score = entry_key, score
+
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][1]
+
+    def put(self, namespace, text, response):
+        """Store a response for the given request text; a missing embedding is computed in the background."""
+        key = (namespace, _digest(text))
+        embedding = self._cached_embedding(text)
+        self._entries[key] = [embedding, response]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if embedding is None:
+            self._embed_in_background(text, entry_key=key)
+
+    def before_model_callback(self, callback_context, llm_request):
+        """ADK callback: short-circuit the model call on a cache hit."""
+        text = _lookup_text(callback_context, llm_request)
+        scope = self.scope(text) if self.scope else None
+        if self.scope and scope is None:
+            return None
+        namespace = _namespace(llm_request, scope)
+        cached = self.get(namespace, text)
+        if cached is not None:
+            logger.info("Semantic cache hit for %s", callback_context.agent_name)
+            return LlmResponse(
+                content=types.ModelContent(parts=[types.Part.from_text(text=cached)])
+            )
+        self._pending[callback_context.invocation_id] = (namespace, text)
+        return None
+
+    def after_model_callback(self, callback_context, llm_response):
+        """ADK callback: store the final model response."""
+        if llm_response.partial:
+            return None
+        pending = self._pending.pop(callback_context.invocation_id, None)
+        if pending is None or not llm_response.content:
+            return None
+        response_text = "".join(
+            part.text for part in (llm_response.content.parts or []) if part.text
+        )
+        if response_text:
+            self.put(*pending, response_text)
+        return None
@@ -2,22 +2,196 @@
 Carbon Pilot Root Agent
 
 This module defines the root agent for the carbon footprint analysis application.
-It uses a sequential agent that executes specialized sub-agents in a predefined order,
+It uses a pipeline agent that executes specialized sub-agents in a predefined order,
 with each agent's output feeding into the next agent in the sequence.
+
+While the first agent (the analyzer) is running, the model clients of the downstream
+agents are warmed up concurrently, so the optimizer's first request does not pay the
+client and credential setup cost after the analyzer has finished.
+
+If the analyzer finds no high or medium impact products, the optimization agents are
+skipped and an empty plan is written to their state keys directly.
+
+For offline runs, set root_agent.batch_mode = True to route every Gemini call through
+the Batch API (see pilot/_batch.py).
 """
 
-from google.adk.agents import SequentialAgent
-from .subagents.analyzer_agent import analyzer_agent
-from .subagents.optimizer_agent import optimizer_agent
-from .subagents.loop_agent import loop_agent
-
-# Create the Sequential Pipeline following proper sequential pattern
-root_agent = SequentialAgent(
-    name="pilot",
-    sub_agents=[
-        analyzer_agent,  # Step 1: Analyze carbon footprint data
-        optimizer_agent , # Step 2: Identify optimization opportunities
-        loop_agent
-    ],
-    description="Sequential pipeline: analyzes carbon data and identifies optimization opportunities",
-)
\ No newline at end of file
+import asyncio
+import functools
+import logging
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import Gemini
+from google.genai import types
+from ._batch import BatchGemini
+from ._parse import JSONDecodeError, parse
+from ._plan_cache import IMPACT_BUCKETS
+from ._semantic_cache import SemanticCache, content_text
+from .schemas import OptimizationPlan, OptimizationStrategies, StrategicSummary
+
+logger = logging.getLogger(__name__)
+
+# Plan returned without an LLM call when there is nothing to optimize
+EMPTY_PLAN = OptimizationPlan(
+    optimization_strategies=OptimizationStrategies(
+        high_impact_recommendations=[],
+        medium_impact_recommendations=[],
+    ),
+    strategic_summary=StrategicSummary(
+        overall_recommendation="No high or medium impact products were identified; no optimization is required.",
+        synergy_opportunities="",
+    ),
+)
+
+
+def _iter_llm_agents(agents):
+    """Yield every LlmAgent in the given agent trees."""
+    for agent in agents:
+        if isinstance(agent, LlmAgent):
+            yield agent
+        yield from _iter_llm_agents(agent.sub_agents)
+
+
+async def _warm_up(agents):
+    """
+    Build the model clients of the given agents ahead of their first call.
+
+    The resolved model is pinned on the agent so the warmed client is the one
+    used by the real request. Failures are ignored here; the actual call will
+    surface them.
+    """
+    clients = []
+    for agent in _iter_llm_agents(agents):
+        if isinstance(agent.model, str):
+            agent.model = agent.canonical_model
+        if hasattr(agent.model, "api_client"):
+            clients.append(asyncio.to_thread(lambda model=agent.model: model.api_client))
+
+    for result in await asyncio.gather(*clients, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.debug("Model client warm-up failed: %s", result)
+
+
+def _route_models(agents, batch_mode):
+    """Switch the Gemini models of the given agents to or from batch mode."""
+    for agent in _iter_llm_agents(agents):
+        model = agent.canonical_model
+        if batch_mode and type(model) is Gemini:
+            agent.model = BatchGemini(model=model.model)
+        elif not batch_mode and isinstance(model, BatchGemini):
+            agent.model = Gemini(model=model.model)
+
+
+def _has_optimization_targets(analysis):
+    """True unless the analysis is known to have no high or medium impact products."""
+    if analysis is None:
+        return True
+    try:
+        analysis = parse(analysis)
+        return any(analysis.get(bucket) for bucket in IMPACT_BUCKETS)
+    except (JSONDecodeError, TypeError, AttributeError):
+        return True
+
+
+class CarbonPipelineAgent(BaseAgent):
+    """
+    Runs its sub-agents in sequence, sharing state through the session.
+
+    The first sub-agent runs concurrently with the warm-up of every later
+    sub-agent's model client. Outputs are handed over through each agent's
+    output_key, exactly like a SequentialAgent. When the first agent's output
+    has no high or medium impact products, the remaining agents are skipped,
+    EMPTY_PLAN is stored under their output keys and their intermediate keys
+    are cleared.
+
+    Attributes:
+        batch_mode: Send model calls through the Gemini Batch API (cheaper,
+            higher latency). Meant for non-interactive bulk runs.
+        semantic_cache: Cache used by the first sub-agent; the user message is
+            embedded in a worker thread before that agent runs, so its model
+            callbacks never block the event loop on the embedding service
+    """
+
+    batch_mode: bool = False
+    semantic_cache: Optional[SemanticCache] = None
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        _route_models(self.sub_agents, self.batch_mode)
+        first, *rest = self.sub_agents
+
+        warm_up = asyncio.create_task(_warm_up(rest))
+        try:
+            if self.semantic_cache is not None and ctx.user_content is not None:
+                await self.semantic_cache.prefetch(content_text(ctx.user_content))
+            async for event in first.run_async(ctx):
+                yield event
+            await warm_up
+        finally:
+            warm_up.cancel()
+
+        if not _has_optimization_targets(ctx.session.state.get(first.output_key)):
+            yield self._empty_plan_event(ctx, rest)
+            return
+
+        for sub_agent in rest:
+            async for event in sub_agent.run_async(ctx):
+                yield event
+
+    def _empty_plan_event(self, ctx, skipped_agents):
+        """Final event carrying EMPTY_PLAN for every skipped agent's output key."""
+        plan = EMPTY_PLAN.model_dump()
+        state_delta = {}
+        for agent in skipped_agents:
+            # Intermediate results of a skipped agent (e.g. the optimizer's per-angle
+            # plans) are cleared so no stale plan from an earlier run remains
+            state_delta.update(dict.fromkeys(getattr(agent, "intermediate_keys", ())))
+            if getattr(agent, "output_key", None):
+                state_delta[agent.output_key] = plan
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.ModelContent(
+                parts=[types.Part.from_text(text=EMPTY_PLAN.model_dump_json())]
+            ),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    async def _run_live_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        for sub_agent in self.sub_agents:
+            async for event in sub_agent.run_live(ctx):
+                yield event
+
+
+@functools.cache
+def _build_root() -> CarbonPipelineAgent:
+    """Import the sub-agents and build the pipeline (once, on first access)."""
+    from .subagents.analyzer_agent import analyzer_agent
+    from .subagents.analyzer_agent.agent import analysis_cache
+    from .subagents.optimizer_agent import optimizer_agent
+    from .subagents.loop_agent import loop_agent
+
+    # Create the pipeline following the sequential pattern
+    return CarbonPipelineAgent(
+        name="pilot",
+        sub_agents=[
+            analyzer_agent,  # Step 1: Analyze carbon footprint data
+            optimizer_agent,  # Step 2: Identify optimization opportunities
+            loop_agent  # Step 3: Align the plan with business requirements
+        ],
+        description="Sequential pipeline: analyzes carbon data and identifies optimization opportunities",
+        semantic_cache=analysis_cache,
+    )
+
+
+def __getattr__(name):
+    if name == "root_agent":
+        return _build_root()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,91 @@
+"""
+Carbon Pilot Output Schemas
+
+Pydantic models describing the structured output of the sub-agents. They are
+passed to each LlmAgent as output_schema, which makes Gemini decode directly into
+JSON matching the schema (response_mime_type="application/json" + response_schema)
+instead of relying on an example embedded in the prompt.
+"""
+
+from pydantic import BaseModel, Field
+
+
+# ---------------------------------------------------------------------------
+# Analyzer Agent
+# ---------------------------------------------------------------------------
+
+class ProductAnalysis(BaseModel):
+    product_name: str
+    material_type: str
+    emission_percentage: float = Field(description="Percentage of total emissions, from the provided data")
+    absolute_emissions: float = Field(description="Total emissions in kg CO2e, from the provided data")
+    emission_factor: float = Field(description="Emission factor in kg CO2e/kg, from the provided data")
+    analysis_summary: str = Field(description="Why the product was placed in this impact category - be specific")
+
+
+class UnprocessedItem(BaseModel):
+    product_name: str
+    material_type: str
+    error: str
+    analysis_summary: str = Field(description="Explanation of the issue")
+
+
+class AnalysisResults(BaseModel):
+    high_impact: list[ProductAnalysis]
+    medium_impact: list[ProductAnalysis]
+    low_impact: list[ProductAnalysis]
+    unprocessed_items: list[UnprocessedItem]
+    strategic_targets: list[str] = Field(description="Specific strategic goals with numbers")
+    quick_wins: list[str] = Field(description="Specific actionable items")
+    key_patterns: str = Field(description="Brief summary of key patterns observed in the data")
+
+
+class ProductReasoning(BaseModel):
+    product_name: str = Field(description="From the input")
+    analysis_summary: str = Field(description="Why the product was placed in its impact category - be specific")
+
+
+class AnalysisReasoning(BaseModel):
+    """Qualitative part of AnalysisResults, used when the rows are pre-bucketed in Python."""
+
+    product_summaries: list[ProductReasoning]
+    strategic_targets: list[str] = Field(description="Specific strategic goals with numbers")
+    quick_wins: list[str] = Field(description="Specific actionable items")
+    key_patterns: str = Field(description="Brief summary of key patterns observed in the data")
+
+
+# ---------------------------------------------------------------------------
+# Optimizer / Loop Agents
+# ---------------------------------------------------------------------------
+
+class ProposedStrategy(BaseModel):
+    strategy_type: str = Field(
+        description="Material Substitution | Supplier Engagement | Product Redesign | Process Improvement"
+    )
+    specific_actions: list[str] = Field(description="Actionable steps for this strategy")
+    expected_outcome: str = Field(description="Brief description of the expected positive environmental impact")
+
+
+class ProductRecommendation(BaseModel):
+    product_name: str = Field(description="From the input")
+    current_material: str = Field(description="From the input")
+    primary_issue: str = Field(description="High Emission Factor / High Volume / Both")
+    proposed_strategies: list[ProposedStrategy]
+
+
+class OptimizationStrategies(BaseModel):
+    high_impact_recommendations: list[ProductRecommendation]
+    medium_impact_recommendations: list[ProductRecommendation]
+
+
+class StrategicSummary(BaseModel):
+    overall_recommendation: str = Field(description="A brief, high-level summary of the most critical action to take")
+    synergy_opportunities: str = Field(
+        description="Whether strategies for different products can be combined "
+                    "(e.g., sourcing the same sustainable alternative for multiple products)"
+    )
+
+
+class OptimizationPlan(BaseModel):
+    optimization_strategies: OptimizationStrategies
+    strategic_summary: StrategicSummary
@@ -0,0 +1,32 @@
+"""
+Shared helpers for the Carbon Pilot sub-agents.
+"""
+
+import re
+import textwrap
+
+# Every sub-agent runs on the fast model: the tasks are structured JSON rewriting
+# of already-computed data, where the larger models mostly add latency and cost.
+MODEL = "gemini-2.0-flash"
+
+_WHITESPACE_RE = re.compile(r"[ \t]+")
+
+
+def compact(text: str) -> str:
+    """
+    Strip prompt indentation and blank lines to cut prefill tokens.
+
+    Lines are dedented and runs of spaces/tabs collapse to a single space, so
+    nested bullets keep a one-space indent.
+
+    Args:
+        text: The raw triple-quoted instruction
+
+    Returns:
+        str: The compacted instruction
+    """
+    return "\n".join(
+        _WHITESPACE_RE.sub(" ", line.rstrip())
+        for line in textwrap.dedent(text).strip().splitlines()
+        if line.strip()
+    )
@@ -1 +1,5 @@
-from .agent import analyzer_agent
\ No newline at end of file
+def __getattr__(name):
+    if name == "analyzer_agent":
+        from .agent import analyzer_agent
+        return analyzer_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
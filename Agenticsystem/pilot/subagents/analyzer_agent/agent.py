@@ -1,25 +1,40 @@
-from google.adk.agents.llm_agent import LlmAgent 
+import functools
+from typing import Final
 
-analyzer_agent = LlmAgent(
-    name="analyzer_agent",
-    model="gemini-2.0-flash",
-    description="Carbon footprint data analyzer that categorizes materials by environmental impact",
-    
-    instruction="""
+from google.adk.agents.llm_agent import LlmAgent
+from ..._categorize import Categorizer, categorize, parse_rows
+from ..._semantic_cache import SemanticCache
+from .._shared import MODEL, compact
+from ...schemas import AnalysisResults
+
+
+def _analysis_scope(text):
+    """
+    Bucket and rounded numbers of every request row, or None if there are no parseable rows.
+
+    The cached reasoning explains each product's category and quotes its numbers,
+    so it is only reused for rows with the same products, buckets and values.
+    """
+    categorized = categorize(parse_rows(text))
+    return tuple(sorted(
+        (product["product_name"], key, round(product["absolute_emissions"]),
+         round(product["emission_percentage"], 1))
+        for key in ("high_impact", "medium_impact", "low_impact")
+        for product in categorized[key]
+    ) + sorted(
+        (item["product_name"], "unprocessed_items") for item in categorized["unprocessed_items"]
+    )) or None
+
+
+# Near-duplicate carbon data (e.g. the same figures with different wording) reuses
+# the previous reasoning; the numbers and impact buckets are always computed from the
+# current rows. A hit also requires the same products in the same buckets with the
+# same rounded emissions and percentages
+analysis_cache = SemanticCache(scope=_analysis_scope)
+
+ANALYZER_INSTRUCTION: Final[str] = compact("""
     You are the Analyzer Agent - a data analysis specialist for carbon emissions.
     
-    ⚠️ CRITICAL OUTPUT REQUIREMENT ⚠️
-    Your ENTIRE response must be ONLY a valid JSON object.
-    - First character: {
-    - Last character: }
-    - NO text before the JSON
-    - NO text after the JSON
-    - NO markdown code blocks like ```json
-    - NO explanations or commentary
-    - JUST the raw JSON object
-    
-    If you include ANY text outside the JSON object, the system will FAIL.
-    
     IMPORTANT: You are NOT a calculator. All calculations are already done. 
     Your job is to ANALYZE and CATEGORIZE the provided data.
     
@@ -53,64 +68,10 @@ analyzer_agent = LlmAgent(
        - Low priority: Products with minimal environmental impact
     
     OUTPUT REQUIREMENTS:
-    Provide your analysis in this EXACT JSON structure.
-    Do NOT change key names. Do NOT add extra nesting levels. Do NOT wrap the JSON in markdown code blocks.
-    The output must be a raw JSON string starting with '{' and ending with '}'.
-    
-    {
-      "analysis_results": {
-        "high_impact": [
-          {
-            "product_name": "string",
-            "material_type": "string",
-            "emission_percentage": number (from provided data),
-            "absolute_emissions": number (from provided data),
-            "emission_factor": number (from provided data),
-            "analysis_summary": "why you categorized it as high impact - be specific"
-          }
-        ],
-        "medium_impact": [
-          {
-            "product_name": "string",
-            "material_type": "string",
-            "emission_percentage": number (from provided data),
-            "absolute_emissions": number (from provided data),
-            "emission_factor": number (from provided data),
-            "analysis_summary": "why you categorized it as medium impact - be specific"
-          }
-        ],
-        "low_impact": [
-          {
-            "product_name": "string",
-            "material_type": "string",
-            "emission_percentage": number (from provided data),
-            "absolute_emissions": number (from provided data),
-            "emission_factor": number (from provided data),
-            "analysis_summary": "why you categorized it as low impact - be specific"
-          }
-        ],
-        "unprocessed_items": [
-          {
-            "product_name": "string",
-            "material_type": "string",
-            "error": "error message",
-            "analysis_summary": "explanation of the issue"
-          }
-        ],
-        "strategic_targets": [
-          "Target 1: Specific strategic goal with numbers",
-          "Target 2: Another strategic goal"
-        ],
-        "quick_wins": [
-          "Quick win 1: Specific actionable item",
-          "Quick win 2: Another quick win"
-        ],
-        "key_patterns": "Brief summary of key patterns observed in the data"
-      }
-    }
+    Return an AnalysisResults object.
     
     RULES:
-    - STRICTLY FOLLOW THE JSON SCHEMA ABOVE.
+    - STRICTLY FOLLOW THE RESPONSE SCHEMA.
     - DO NOT perform any calculations
     - DO NOT modify the numbers provided
     - ONLY analyze, categorize, and provide insights
@@ -119,7 +80,75 @@ analyzer_agent = LlmAgent(
     - Be specific about WHY you categorize each item
     
     Your structured output will guide the Optimizer Agent's recommendations.
-    """,
+    """)
+
+# Used instead of ANALYZER_INSTRUCTION when the rows were bucketed in Python
+ANALYZER_REASONING_INSTRUCTION: Final[str] = compact("""
+    You are the Analyzer Agent - a data analysis specialist for carbon emissions.
     
-    output_key="analysis_results"
-)
\ No newline at end of file
+    The products have already been categorized by share of total emissions (HIGH >40%, MEDIUM 15-40%, LOW <15%).
+    You receive them as PRE-BUCKETED ROWS after the original data. Do NOT change the categories or the numbers.
+    
+    YOUR TASK:
+    Produce only the qualitative fields:
+    - product_summaries: for every product, why it belongs in its impact category (emission factor vs volume) - be specific
+    - strategic_targets: high emissions requiring complex changes, with numbers
+    - quick_wins: medium emissions with easy alternatives
+    - key_patterns: which products dominate emissions (80/20 rule), carbon-intensive materials, outliers
+    
+    RULES:
+    - STRICTLY FOLLOW THE RESPONSE SCHEMA.
+    - DO NOT perform any calculations
+    - Use the exact numbers from the input data
+    """)
+
+# Parseable rows are bucketed with NumPy; the model only writes the reasoning fields
+categorizer = Categorizer(ANALYZER_REASONING_INSTRUCTION)
+
+
+def before_model_callback(callback_context, llm_request):
+    """
+    Pre-bucket the rows, then serve the reasoning for near-duplicate rows from the cache.
+
+    Only pre-bucketed requests use the cache, and only the model's reasoning is
+    cached: on a hit the analysis is still assembled from the current rows.
+    """
+    categorizer.before_model_callback(callback_context, llm_request)
+    if not categorizer.active(callback_context):
+        return None
+    reasoning = analysis_cache.before_model_callback(callback_context, llm_request)
+    if reasoning is None:
+        return None
+    return categorizer.after_model_callback(callback_context, reasoning)
+
+
+def after_model_callback(callback_context, llm_response):
+    """Cache the model's reasoning, then assemble the full analysis from it."""
+    if categorizer.active(callback_context):
+        analysis_cache.after_model_callback(callback_context, llm_response)
+    return categorizer.after_model_callback(callback_context, llm_response)
+
+
+@functools.cache
+def _build() -> LlmAgent:
+    """Build the analyzer agent (once, on first access)."""
+    return LlmAgent(
+        name="analyzer_agent",
+        model=MODEL,
+        description="Carbon footprint data analyzer that categorizes materials by environmental impact",
+
+        instruction=ANALYZER_INSTRUCTION,
+
+        output_schema=AnalysisResults,
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+        output_key="analysis_results",
+        before_model_callback=before_model_callback,
+        after_model_callback=after_model_callback
+    )
+
+
+def __getattr__(name):
+    if name == "analyzer_agent":
+        return _build()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
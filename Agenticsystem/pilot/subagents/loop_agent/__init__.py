@@ -1 +1,5 @@
-from .agent import loop_agent
\ No newline at end of file
+def __getattr__(name):
+    if name == "loop_agent":
+        from .agent import loop_agent
+        return loop_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1 +1,5 @@
-from .agent import optimizer_agent
\ No newline at end of file
+def __getattr__(name):
+    if name == "optimizer_agent":
+        from .agent import optimizer_agent
+        return optimizer_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,105 +1,222 @@
+"""
+Optimizer Agent
+
+The optimizer fans out into one sub-agent per recommendation angle (material
+substitution, supplier engagement, product redesign, process improvement). The
+angle agents run in parallel, each decoding roughly a quarter of the full plan, and
+their plans are merged into a single OptimizationPlan stored under
+'optimization_plan'.
+"""
+
+import functools
+import string
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, ParallelAgent
+from google.adk.agents.invocation_context import InvocationContext
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.events import Event, EventActions
+from google.genai import types
+from .._shared import MODEL, compact
+from ..._parse import JSONDecodeError, parse
+from ..._plan_cache import PlanTemplateCache
+from ...schemas import OptimizationPlan
 
-# Assume 'analyzer_agent' is the agent you defined in your question.
-# analyzer_agent = LlmAgent(...) 
+# Analyses with the same materials in the same impact buckets reuse the previous plan as a skeleton
+plan_cache = PlanTemplateCache()
 
-optimizer_agent = LlmAgent(
-    name="optimizer_agent",
-    model="gemini-2.0-flash", # Using a more powerful model for creative, strategic recommendations
-    description="Generates actionable strategies to reduce carbon footprint based on analysis",
-    
-    instruction="""
+RECOMMENDATION_KEYS = ("high_impact_recommendations", "medium_impact_recommendations")
+
+# (agent name prefix, strategy_type, guidance) for each recommendation angle
+ANGLES = (
+    ("material_substitution", "Material Substitution", """
+        - Can a lower-carbon alternative be used? (e.g., recycled content, bio-plastics, sustainably sourced materials).
+        - Suggest specific alternative materials and justify why they are better.
+    """),
+    ("supplier_engagement", "Supplier Engagement", """
+        - Recommend collaborating with suppliers to get more sustainable materials.
+        - Suggest sourcing from suppliers who use renewable energy or have better environmental practices.
+    """),
+    ("product_redesign", "Product Redesign", """
+        - Can the product be redesigned to use less material? (e.g., lightweighting).
+        - Can the design be optimized for easier disassembly and recycling?
+    """),
+    ("process_improvement", "Process Improvement", """
+        - Suggest potential improvements in the manufacturing process that could reduce waste or energy consumption associated with the material.
+    """),
+)
+
+OPTIMIZER_INSTRUCTION_TEMPLATE = string.Template(compact("""
     You are the Optimizer Agent - an expert in environmental engineering and sustainable supply chain solutions.
     
-    CRITICAL: Return ONLY the JSON object. Do NOT include any explanatory text before or after the JSON.
-    Do NOT wrap in markdown code blocks. Do NOT add commentary. ONLY return raw JSON starting with { and ending with }.
-    
     Your goal is to provide actionable recommendations based on the data analysis from the Analyzer Agent.
     
     IMPORTANT: You ONLY focus on the 'high_impact' and 'medium_impact' categories provided. Ignore 'low_impact' items for optimization.
-    IMPORTANT: You must produce a single valid JSON object that exactly matches the schema below. 
     If a required field has no content, return an empty array [] or empty string "" rather than omitting the field.
     
     YOUR PRIMARY TASK:
     Based on the provided JSON analysis, generate specific, practical, and targeted strategies to reduce the carbon footprint of the identified products.
     
-    RECOMMENDATION FRAMEWORK:
-    For each high and medium impact product, formulate your advice considering these angles:
-    
-    1.  **Material Substitution:**
-        - Can a lower-carbon alternative be used? (e.g., recycled content, bio-plastics, sustainably sourced materials).
-        - Suggest specific alternative materials and justify why they are better.
-    
-    2.  **Supplier Engagement & Sourcing:**
-        - Recommend collaborating with suppliers to get more sustainable materials.
-        - Suggest sourcing from suppliers who use renewable energy or have better environmental practices.
-    
-    3.  **Product Design & Efficiency (Redesign):**
-        - Can the product be redesigned to use less material? (e.g., lightweighting).
-        - Can the design be optimized for easier disassembly and recycling?
-    
-    4.  **Process Improvement:**
-        - Suggest potential improvements in the manufacturing process that could reduce waste or energy consumption associated with the material.
-    
+    RECOMMENDATION ANGLE:
+    You cover ONLY the **$strategy_type** angle. Other angles are handled by other agents.
+    For each high and medium impact product, formulate your advice considering:
+    $guidance
+    Every proposed strategy must have strategy_type "$strategy_type".
+
     INPUT:
     You will receive a JSON object from the 'analyzer_agent' containing categories, insights, and priorities.
     
     OUTPUT REQUIREMENTS:
-    Provide your recommendations in this EXACT JSON structure. Do NOT add any text, markdown code fences, commentary, or explanations outside of the JSON block.
-    Do NOT change key names. Do NOT add extra nesting levels.
-    The output must be a raw JSON string starting with '{' and ending with '}'.
-    
-    {
-      "optimization_strategies": {
-        "high_impact_recommendations": [
-          {
-            "product_name": "string (from input)",
-            "current_material": "string (from input)",
-            "primary_issue": "High Emission Factor / High Volume / Both",
-            "proposed_strategies": [
-              {
-                "strategy_type": "Material Substitution | Supplier Engagement | Product Redesign | Process Improvement",
-                "specific_actions": [
-                    "Actionable step 1 for this strategy.",
-                    "Actionable step 2 for this strategy."
-                ],
-                "expected_outcome": "Brief description of the expected positive environmental impact."
-              }
-            ]
-          }
-        ],
-        "medium_impact_recommendations": [
-          {
-            "product_name": "string (from input)",
-            "current_material": "string (from input)",
-            "primary_issue": "High Emission Factor / High Volume / Both",
-            "proposed_strategies": [
-              {
-                "strategy_type": "Material Substitution | Supplier Engagement | Product Redesign | Process Improvement",
-                "specific_actions": [
-                    "Actionable step 1.",
-                    "Actionable step 2."
-                ],
-                "expected_outcome": "Brief description of the expected positive environmental impact."
-              }
-            ]
-          }
-        ]
-      },
-      "strategic_summary": {
-        "overall_recommendation": "A brief, high-level summary of the most critical action to take.",
-        "synergy_opportunities": "Identify if strategies for different products can be combined (e.g., sourcing the same sustainable alternative for multiple products)."
-      }
-    }
+    Return an OptimizationPlan object.
     
     RULES:
-    - STRICTLY FOLLOW THE JSON SCHEMA ABOVE.
+    - STRICTLY FOLLOW THE RESPONSE SCHEMA.
     - BE SPECIFIC AND ACTIONABLE. Avoid vague advice like "be more green."
     - Ground your recommendations in the data provided (e.g., "Since Aluminum has a high emission factor...").
     - Focus ONLY on the 'high_impact' and 'medium_impact' products from the input.
     - Directly address the 'strategic_targets' and 'quick_wins' identified in the analysis.
-    - Ensure the output is a single, valid JSON object. Reject any temptation to include narrative text or markdown formatting.
-    """,
-    
-    output_key="optimization_plan"
-)
\ No newline at end of file
+    """))
+
+
+def merge_plans(plans):
+    """
+    Merge the per-angle plans into one plan.
+
+    Recommendations are merged per product; strategies of the same type for the
+    same product have their specific actions concatenated.
+
+    Args:
+        plans: Plans from the angle agents (dicts or JSON strings); None entries are skipped
+
+    Returns:
+        dict: The merged plan, matching the OptimizationPlan schema
+    """
+    merged = {key: {} for key in RECOMMENDATION_KEYS}
+    overall, synergies = [], []
+
+    for plan in plans:
+        if plan is None:
+            continue
+        try:
+            plan = parse(plan)
+        except JSONDecodeError:
+            continue
+
+        strategies = plan.get("optimization_strategies", {})
+        for key in RECOMMENDATION_KEYS:
+            for recommendation in strategies.get(key, []):
+                product = merged[key].setdefault(
+                    recommendation["product_name"],
+                    {**recommendation, "proposed_strategies": {}},
+                )
+                for strategy in recommendation.get("proposed_strategies", []):
+                    existing = product["proposed_strategies"].get(strategy["strategy_type"])
+                    if existing is None:
+                        product["proposed_strategies"][strategy["strategy_type"]] = {
+                            **strategy, "specific_actions": list(strategy["specific_actions"])
+                        }
+                    else:
+                        existing["specific_actions"].extend(strategy["specific_actions"])
+
+        summary = plan.get("strategic_summary", {})
+        if summary.get("overall_recommendation"):
+            overall.append(summary["overall_recommendation"])
+        if summary.get("synergy_opportunities"):
+            synergies.append(summary["synergy_opportunities"])
+
+    return {
+        "optimization_strategies": {
+            key: [
+                {**product, "proposed_strategies": list(product["proposed_strategies"].values())}
+                for product in merged[key].values()
+            ]
+            for key in RECOMMENDATION_KEYS
+        },
+        "strategic_summary": {
+            "overall_recommendation": " ".join(overall),
+            "synergy_opportunities": " ".join(synergies),
+        },
+    }
+
+
+class OptimizerAgent(BaseAgent):
+    """
+    Runs the angle agents in parallel and merges their plans.
+
+    Attributes:
+        output_key: Session state key for the merged plan
+    """
+
+    output_key: str = "optimization_plan"
+
+    @property
+    def intermediate_keys(self):
+        """Session state keys of the per-angle plans."""
+        return tuple(f"{prefix}_plan" for prefix, _, _ in ANGLES)
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        # Clear the previous run's angle plans, so an angle that produces nothing
+        # this time is not merged from stale state
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=dict.fromkeys(self.intermediate_keys)),
+        )
+
+        for sub_agent in self.sub_agents:
+            async for event in sub_agent.run_async(ctx):
+                yield event
+
+        plan = merge_plans(ctx.session.state.get(key) for key in self.intermediate_keys)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.ModelContent(
+                parts=[types.Part.from_text(text=OptimizationPlan.model_validate(plan).model_dump_json())]
+            ),
+            actions=EventActions(state_delta={self.output_key: plan}),
+        )
+
+
+@functools.cache
+def _build() -> OptimizerAgent:
+    """Build the optimizer and its angle agents (once, on first access)."""
+    angle_agents = [
+        LlmAgent(
+            name=f"{prefix}_agent",
+            model=MODEL,
+            description=f"Generates {strategy_type} strategies to reduce carbon footprint based on analysis",
+            instruction=OPTIMIZER_INSTRUCTION_TEMPLATE.substitute(
+                strategy_type=strategy_type, guidance=compact(guidance)
+            ),
+            output_schema=OptimizationPlan,
+            disallow_transfer_to_parent=True,
+            disallow_transfer_to_peers=True,
+            output_key=f"{prefix}_plan",
+            before_model_callback=plan_cache.before_model_callback,
+            after_model_callback=plan_cache.after_model_callback
+        )
+        for prefix, strategy_type, guidance in ANGLES
+    ]
+
+    return OptimizerAgent(
+        name="optimizer_agent",
+        description="Generates actionable strategies to reduce carbon footprint based on analysis",
+        sub_agents=[
+            ParallelAgent(
+                name="optimizer_angles",
+                sub_agents=angle_agents,
+                description="Runs one optimizer per recommendation angle in parallel",
+            )
+        ],
+    )
+
+
+def __getattr__(name):
+    if name == "optimizer_agent":
+        return _build()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,13 +9,125 @@ This script demonstrates how to:
 This is the REAL implementation that uses actual agent output, not hardcoded data.
 """
 
+import hashlib
+import json
+import logging
+import operator
 import webbrowser
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from google.adk import Runner
+from pilot._parse import JSONDecodeError, extract_object, parse
 from pilot.agent import root_agent
+from pilot.subagents._shared import MODEL
+from pilot.subagents.loop_agent.agent import load_business_requirements
 from visualizer import save_dashboard, save_report
 
+logger = logging.getLogger(__name__)
+
+
+# event.content.parts in one lookup; raises AttributeError when the event has no content
+_get_parts = operator.attrgetter('content.parts')
+
+# Parsed agent results are stored here, keyed by a hash of the input data
+CACHE_DIR = ".cache"
+
+# Part of the cache key: bump when the agent instructions or schemas change, so
+# results produced by an older pipeline are not served again
+PIPELINE_VERSION = "carbon-pipeline-1"
+
+
+def _cache_path(carbon_data):
+    """
+    Path of the cached result for this input
+    
+    The key is a BLAKE2b hash of the canonical JSON of the input data together with
+    everything else the result depends on: the pipeline version, the model and the
+    business requirements.
+    """
+    canonical = json.dumps({
+        'pipeline_version': PIPELINE_VERSION,
+        'model': MODEL,
+        'business_requirements': load_business_requirements(),
+        'carbon_data': carbon_data
+    }, sort_keys=True, separators=(',', ':'))
+    key = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, f"carbon_{key}.json")
+
+
+def _load_cached(path):
+    """Load a cached result, or None if there is none (or it is unreadable)."""
+    try:
+        with open(path, 'r') as f:
+            return parse(f.read())
+    except (OSError, JSONDecodeError):
+        return None
+
+
+def _store_cached(path, analysis_results):
+    """Write a parsed result to the cache."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(analysis_results, f)
+
+
+def _run_agent(prompt):
+    """
+    Run the agent pipeline on the prompt and parse its final JSON output
+    
+    Returns:
+        dict: The parsed output, or None if it could not be extracted
+    """
+    # CORRECT WAY: Create runner without passing agent
+    runner = Runner()
+    
+    # Run the agent - pass the agent and prompt to run method
+    # The run method returns a generator of events; only the text of the
+    # latest event is kept, so memory stays constant however long the run is
+    analysis_text = None
+    
+    for event in runner.run(root_agent, prompt):
+        # Print progress and remember the latest text payload
+        try:
+            parts = _get_parts(event) or ()
+        except AttributeError:  # no content on this event
+            continue
+        for part in parts:
+            text = getattr(part, 'text', None)
+            if text:
+                logger.info("   Agent is thinking...")
+                analysis_text = text
+                break
+    
+    logger.info("✅ Analysis Complete!")
+    
+    # Step 4: Extract the final response
+    # The last event with text carries the pipeline's final output
+    if not analysis_text:
+        logger.error("❌ Error: Could not extract text from agent response")
+        return None
+    
+    # Parse the JSON from the response
+    # The agent should return pure JSON, but might have extra text
+    try:
+        # Find the first complete JSON object in the response
+        json_str = extract_object(analysis_text)
+        
+        if json_str is None:
+            logger.error("❌ Error: No JSON found in agent response")
+            logger.error("Agent Response:\n%s", analysis_text)
+            return None
+        
+        analysis_results = parse(json_str)
+        
+    except JSONDecodeError as e:
+        logger.error("❌ Error: Failed to parse JSON from agent response: %s", e)
+        logger.error("Agent Response:\n%s", analysis_text)
+        return None
+    
+    return analysis_results
+
 
 def run_carbon_analysis(carbon_data):
     """
@@ -45,187 +157,115 @@ def run_carbon_analysis(carbon_data):
         dict: The analysis results from the analyzer agent
     """
     
-    print("=" * 70)
-    print("🌱 Carbon Pilot - Dynamic Analysis & Visualization")
-    print("=" * 70)
+    logger.info("=" * 70)
+    logger.info("🌱 Carbon Pilot - Dynamic Analysis & Visualization")
+    logger.info("=" * 70)
     
     # Step 1: Format the input data for the agent
-    print("\n📊 Input Data Summary:")
-    print(f"   - Total Products: {carbon_data['summary']['total_products']}")
-    print(f"   - Total Emissions: {carbon_data['summary']['total_emissions']:,.2f} kg CO2e")
-    print(f"   - Products:")
+    summary = carbon_data['summary']
+    total_emissions = summary['total_emissions']
+    inv_total = 100.0 / total_emissions if total_emissions else 0.0
+    
+    logger.info("📊 Input Data Summary:")
+    logger.info("   - Total Products: %s", summary['total_products'])
+    logger.info("   - Total Emissions: %s kg CO2e", f"{total_emissions:,.2f}")
+    logger.info("   - Products:")
     for product in carbon_data['products']:
-        print(f"      • {product['product_name']}: {product['total_emissions']:,.2f} kg CO2e")
+        logger.info("      • %s: %s kg CO2e", product['product_name'], f"{product['total_emissions']:,.2f}")
     
     # Step 2: Create the prompt for the analyzer agent
-    prompt = f"""
-    Please analyze the following carbon footprint data:
-    
-    PRODUCTS DATA:
-    """
+    parts = ["Please analyze the following carbon footprint data:\n\nPRODUCTS DATA:\n"]
     
     for product in carbon_data['products']:
-        prompt += f"""
-    Product: {product['product_name']}
-    - Material Type: {product['material_type']}
-    - Weight: {product['weight_kg']} kg
-    - Emission Factor: {product['emission_factor']} kg CO2e/kg
-    - Total Emissions: {product['total_emissions']} kg CO2e
-    - Percentage of Total: {(product['total_emissions'] / carbon_data['summary']['total_emissions'] * 100):.2f}%
-    """
-    
-    prompt += f"""
+        parts.append(
+            f"Product: {product['product_name']}\n"
+            f"- Material Type: {product['material_type']}\n"
+            f"- Weight: {product['weight_kg']} kg\n"
+            f"- Emission Factor: {product['emission_factor']} kg CO2e/kg\n"
+            f"- Total Emissions: {product['total_emissions']} kg CO2e\n"
+            f"- Percentage of Total: {(product['total_emissions'] * inv_total):.2f}%\n"
+        )
     
-    SUMMARY:
-    - Total Emissions: {carbon_data['summary']['total_emissions']} kg CO2e
-    - Total Products: {carbon_data['summary']['total_products']}
-    - Average Emissions per Product: {carbon_data['summary']['average_emissions_per_product']:.2f} kg CO2e
-    
-    Please provide your analysis in the exact JSON structure specified in your instructions.
-    """
+    parts.append(
+        "\nSUMMARY:\n"
+        f"- Total Emissions: {total_emissions} kg CO2e\n"
+        f"- Total Products: {summary['total_products']}\n"
+        f"- Average Emissions per Product: {summary['average_emissions_per_product']:.2f} kg CO2e\n"
+        "\nPlease provide your analysis in the exact JSON structure specified in your instructions.\n"
+    )
+    prompt = "".join(parts)
     
     # Step 3: Run the analyzer agent
-    print("\n🤖 Running Analyzer Agent...")
-    print("   (This may take a few moments...)")
+    logger.info("🤖 Running Analyzer Agent...")
+    logger.info("   (This may take a few moments...)")
     
     try:
-        # CORRECT WAY: Create runner without passing agent
-        runner = Runner()
-        
-        # Run the agent - pass the agent and prompt to run method
-        # The run method returns a generator of events
-        events = []
-        
-        # Collect all events from the agent
-        for event in runner.run(root_agent, prompt):
-            events.append(event)
-            
-            # Print progress
-            if hasattr(event, 'content') and event.content:
-                if hasattr(event.content, 'parts'):
-                    for part in event.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            print("   Agent is thinking...")
-        
-        print("✅ Analysis Complete!")
-        
-        # Step 4: Extract the final response
-        # The last event typically contains the final response
-        if not events:
-            print("\n❌ Error: No events received from agent")
-            return None
+        # Reuse the result of a previous run on identical input data
+        cache_path = _cache_path(carbon_data)
+        analysis_results = _load_cached(cache_path)
         
-        # Get the last event's text content
-        final_event = events[-1]
-        analysis_text = None
-        
-        if hasattr(final_event, 'content') and final_event.content:
-            if hasattr(final_event.content, 'parts'):
-                for part in final_event.content.parts:
-                    if hasattr(part, 'text') and part.text:
-                        analysis_text = part.text
-                        break
-        
-        if not analysis_text:
-            print("\n❌ Error: Could not extract text from agent response")
-            return None
-        
-        # Parse the JSON from the response
-        # The agent should return pure JSON, but might have extra text
-        try:
-            # Try to find JSON in the response
-            start_idx = analysis_text.find('{')
-            end_idx = analysis_text.rfind('}') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                print("\n❌ Error: No JSON found in agent response")
-                print(f"\nAgent Response:\n{analysis_text}")
+        if analysis_results is not None:
+            logger.info("✅ Loaded cached analysis for identical input data")
+        else:
+            analysis_results = _run_agent(prompt)
+            if analysis_results is None:
                 return None
-            
-            json_str = analysis_text[start_idx:end_idx]
-            analysis_results = json.loads(json_str)
-            
-        except json.JSONDecodeError as e:
-            print(f"\n❌ Error: Failed to parse JSON from agent response: {e}")
-            print(f"\nAgent Response:\n{analysis_text}")
-            return None
+            # A failed write only loses the cache entry, not the result
+            try:
+                _store_cached(cache_path, analysis_results)
+            except OSError as e:
+                logger.warning("⚠️ Could not cache the analysis in %s: %s", cache_path, e)
         
-        print("✅ Analysis Complete!")
+        logger.info("✅ Analysis Complete!")
         
         # Step 5: Visualize the dynamic results
-        print("\n🎨 Creating Visualizations from Agent Output...")
-        
-        # Create dashboard
-        print("   1️⃣ Generating interactive dashboard...")
-        save_dashboard(analysis_results, "carbon_analysis_dashboard.html")
+        logger.info("🎨 Creating Visualizations from Agent Output...")
         
-        # Create detailed report
-        print("   2️⃣ Generating detailed report...")
-        save_report(analysis_results, "carbon_analysis_report.html")
+        # Create the dashboard and the detailed report concurrently (independent files)
+        logger.info("   1️⃣ Generating interactive dashboard...")
+        logger.info("   2️⃣ Generating detailed report...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            dashboard_future = executor.submit(save_dashboard, analysis_results, "carbon_analysis_dashboard.html")
+            report_future = executor.submit(save_report, analysis_results, "carbon_analysis_report.html")
+            dashboard_future.result()
+            report_future.result()
         
-        print("\n✅ Visualizations Created!")
+        logger.info("✅ Visualizations Created!")
         
         # Step 6: Open in browser
-        print("\n🌐 Opening visualizations in browser...")
-        dashboard_path = os.path.abspath("carbon_analysis_dashboard.html")
-        report_path = os.path.abspath("carbon_analysis_report.html")
+        logger.info("🌐 Opening visualizations in browser...")
+        cwd = Path.cwd()
+        dashboard_uri = (cwd / "carbon_analysis_dashboard.html").as_uri()
+        report_uri = (cwd / "carbon_analysis_report.html").as_uri()
         
-        webbrowser.open(f'file://{dashboard_path}')
-        print("   ✓ Opened dashboard")
+        webbrowser.open(dashboard_uri)
+        logger.info("   ✓ Opened dashboard")
         
-        webbrowser.open(f'file://{report_path}')
-        print("   ✓ Opened detailed report")
+        webbrowser.open_new_tab(report_uri)
+        logger.info("   ✓ Opened detailed report")
         
-        print("\n" + "=" * 70)
-        print("✅ COMPLETE: Dynamic analysis and visualization finished!")
-        print("=" * 70)
+        logger.info("=" * 70)
+        logger.info("✅ COMPLETE: Dynamic analysis and visualization finished!")
+        logger.info("=" * 70)
         
         return analysis_results
         
     except Exception as e:
-        print(f"\n❌ Error during analysis: {str(e)}")
-        print("\nTroubleshooting:")
-        print("   1. Check that your .env file has valid API keys")
-        print("   2. Ensure the analyzer agent is properly configured")
-        print("   3. Verify the input data format is correct")
+        logger.error("❌ Error during analysis: %s", e)
+        logger.error("Troubleshooting:")
+        logger.error("   1. Check that your .env file has valid API keys")
+        logger.error("   2. Ensure the analyzer agent is properly configured")
+        logger.error("   3. Verify the input data format is correct")
         return None
 
 
 # Example usage with real carbon footprint data
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     # This would typically come from your carbon calculation service
     # Replace this with actual data from your Next.js app or calculation engine
-    sample_carbon_data = {
-        "products": [
-            {
-                "product_name": "Steel Frame",
-                "material_type": "Steel",
-                "weight_kg": 3000,
-                "emission_factor": 1.85,
-                "total_emissions": 5550
-            },
-            {
-                "product_name": "Plastic Case",
-                "material_type": "Plastic",
-                "weight_kg": 250,
-                "emission_factor": 6.0,
-                "total_emissions": 1500
-            },
-            {
-                "product_name": "Cotton T-Shirt",
-                "material_type": "Cotton",
-                "weight_kg": 200,
-                "emission_factor": 5.3,
-                "total_emissions": 1060
-            }
-        ],
-        "summary": {
-            "total_emissions": 8110,
-            "total_products": 3,
-            "average_emissions_per_product": 2703.33
-        }
-    }
+    from _fixtures import SAMPLE_CARBON_DATA as sample_carbon_data
     
     print("\n🚀 Starting Carbon Analysis with DYNAMIC Agent Output\n")
     print("📝 Note: This uses the ACTUAL analyzer agent output, not hardcoded data!")
@@ -11,44 +11,12 @@ Usage:
 """
 
 import webbrowser
-import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from pilot.agent import root_agent
 from visualizer import create_dashboard, create_detailed_report, save_dashboard, save_report
 
 
-# Sample carbon footprint data (example from your calculations)
-sample_carbon_data = {
-    "products": [
-        {
-            "product_name": "Steel Frame",
-            "material_type": "Steel",
-            "weight_kg": 3000,
-            "emission_factor": 1.85,
-            "total_emissions": 5550
-        },
-        {
-            "product_name": "Plastic Case",
-            "material_type": "Plastic",
-            "weight_kg": 250,
-            "emission_factor": 6.0,
-            "total_emissions": 1500
-        },
-        {
-            "product_name": "Cotton T-Shirt",
-            "material_type": "Cotton",
-            "weight_kg": 200,
-            "emission_factor": 5.3,
-            "total_emissions": 1060
-        }
-    ],
-    "summary": {
-        "total_emissions": 8110,
-        "total_products": 3,
-        "average_emissions_per_product": 2703.33
-    }
-}
-
-
 # Example analyzer output structure (what your analyzer agent should return)
 example_analyzer_output = {
     "impact_categories": {
@@ -165,13 +133,14 @@ def test_with_example_data():
     
     print("\n🎨 Creating visualizations...")
     
-    # Create dashboard
+    # Create the dashboard and the detailed report concurrently (independent files)
     print("\n1️⃣ Creating interactive dashboard...")
-    dashboard = save_dashboard(example_analyzer_output, "analyzer_dashboard.html")
-    
-    # Create detailed report
     print("2️⃣ Creating detailed report...")
-    save_report(example_analyzer_output, "analyzer_report.html")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        dashboard_future = executor.submit(save_dashboard, example_analyzer_output, "analyzer_dashboard.html")
+        report_future = executor.submit(save_report, example_analyzer_output, "analyzer_report.html")
+        dashboard = dashboard_future.result()
+        report_future.result()
     
     print("\n✅ All visualizations created successfully!")
     print("\n📂 Files generated:")
@@ -180,13 +149,14 @@ def test_with_example_data():
     
     # Open files in browser
     print("\n🌐 Opening files in browser...")
-    dashboard_path = os.path.abspath("analyzer_dashboard.html")
-    report_path = os.path.abspath("analyzer_report.html")
+    cwd = Path.cwd()
+    dashboard_uri = (cwd / "analyzer_dashboard.html").as_uri()
+    report_uri = (cwd / "analyzer_report.html").as_uri()
     
-    webbrowser.open(f'file://{dashboard_path}')
+    webbrowser.open(dashboard_uri)
     print("   ✓ Opened dashboard")
     
-    webbrowser.open(f'file://{report_path}')
+    webbrowser.open_new_tab(report_uri)
     print("   ✓ Opened report")
     
     print("\n💡 Tip: Check your browser tabs!")
@@ -238,6 +208,8 @@ def test_with_agent(carbon_data):
 
 
 if __name__ == "__main__":
+    from _fixtures import SAMPLE_CARBON_DATA as sample_carbon_data
+    
     print("\n🌱 Carbon Pilot - Analyzer & Visualizer Demo\n")
     
     # For now, use example data
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from pilot._semantic_cache import SemanticCache
+from pilot.subagents.analyzer_agent import agent as analyzer
+
+REASONING = {
+    "product_summaries": [
+        {"product_name": "Steel Frame", "analysis_summary": "Heavy steel drives emissions."},
+        {"product_name": "Plastic Case", "analysis_summary": "Plastic has a high factor."},
+    ],
+    "strategic_targets": ["Steel Frame"],
+    "quick_wins": ["Plastic Case"],
+    "key_patterns": "Steel dominates.",
+}
+
+
+def _prompt(steel_emissions, steel_pct, steel_name="Steel Frame"):
+    return (
+        "Please analyze the following carbon footprint data:\n\nPRODUCTS DATA:\n"
+        f"Product: {steel_name}\n- Material Type: Steel\n- Weight: 3000 kg\n"
+        "- Emission Factor: 1.85 kg CO2e/kg\n"
+        f"- Total Emissions: {steel_emissions} kg CO2e\n- Percentage of Total: {steel_pct}%\n"
+        "Product: Plastic Case\n- Material Type: Plastic\n- Weight: 250 kg\n"
+        "- Emission Factor: 6.0 kg CO2e/kg\n"
+        "- Total Emissions: 1500 kg CO2e\n- Percentage of Total: 18.50%\n"
+        "\nSUMMARY:\n- Total Products: 2\n"
+    )
+
+
+def _context(prompt, invocation_id):
+    return SimpleNamespace(
+        invocation_id=invocation_id,
+        agent_name="analyzer_agent",
+        state={},
+        user_content=types.UserContent(parts=[types.Part.from_text(text=prompt)]),
+    )
+
+
+def _request(prompt):
+    return LlmRequest(
+        model="gemini-2.0-flash",
+        contents=[types.UserContent(parts=[types.Part.from_text(text=prompt)])],
+        config=types.GenerateContentConfig(system_instruction=analyzer.ANALYZER_INSTRUCTION),
+    )
+
+
+def _text(llm_response):
+    return "".join(part.text for part in llm_response.content.parts if part.text)
+
+
+def _model_output(text):
+    return LlmResponse(content=types.ModelContent(parts=[types.Part.from_text(text=text)]))
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SemanticCache(scope=analyzer._analysis_scope)
+    cache.embedding_threads = []
+
+    def fake_embed(text):
+        # Every request is "semantically identical"; no embedding service is called
+        cache.embedding_threads.append(threading.current_thread())
+        return (1.0,)
+
+    monkeypatch.setattr(cache, "_embed_uncached", fake_embed)
+    monkeypatch.setattr(analyzer, "analysis_cache", cache)
+    return cache
+
+
+async def _run(cache, prompt, invocation_id, reasoning=REASONING):
+    """One analyzer model call as the pipeline makes it: prefetch, then the callbacks."""
+    await cache.prefetch(prompt)
+    context = _context(prompt, invocation_id)
+    hit = analyzer.before_model_callback(context, _request(prompt))
+    if hit is not None:
+        return hit, True
+    response = analyzer.after_model_callback(context, _model_output(json.dumps(reasoning)))
+    # Let the background embedding of the new entry finish
+    await asyncio.gather(*list(cache._tasks.values()))
+    return response, False
+
+
+def test_cache_hit_reuses_reasoning_for_the_same_rounded_rows(cache):
+    async def scenario():
+        first, hit = await _run(cache, _prompt(5550, "68.40"), "inv-1")
+        assert not hit
+        assert json.loads(_text(first))["high_impact"][0]["absolute_emissions"] == 5550
+
+        # Same catalog and figures, up to rounding
+        second, hit = await _run(cache, _prompt("5550.2", "68.42"), "inv-2", reasoning=None)
+        assert hit
+        return json.loads(_text(second))
+
+    analysis = asyncio.run(scenario())
+    steel = analysis["high_impact"][0]
+    assert steel["absolute_emissions"] == 5550.2
+    assert steel["emission_percentage"] == 68.42
+    assert steel["analysis_summary"] == "Heavy steel drives emissions."
+    assert analysis["quick_wins"] == ["Plastic Case"]
+
+
+def test_bucket_change_is_a_miss(cache):
+    async def scenario():
+        await _run(cache, _prompt(5550, "68.40"), "inv-1")
+        # Same catalog, next month: the steel share drops into the medium bucket
+        return await _run(cache, _prompt(2000, "35.00"), "inv-2")
+
+    analysis, hit = asyncio.run(scenario())
+    assert not hit
+    assert json.loads(_text(analysis))["high_impact"] == []
+
+
+def test_changed_numbers_are_a_miss(cache):
+    async def scenario():
+        await _run(cache, _prompt(5550, "68.40"), "inv-1")
+        _, hit = await _run(cache, _prompt(5200, "66.10"), "inv-2")
+        return hit
+
+    assert not asyncio.run(scenario())
+
+
+def test_embeddings_are_computed_off_the_event_loop(cache):
+    async def scenario():
+        await _run(cache, _prompt(5550, "68.40"), "inv-1")
+        await _run(cache, _prompt(2000, "35.00"), "inv-2")
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(scenario())
+    assert len(cache.embedding_threads) == 2
+    assert loop_thread not in cache.embedding_threads
+
+
+def test_semantic_hit_requires_the_same_products(cache):
+    async def scenario():
+        await _run(cache, _prompt(5550, "68.40"), "inv-1")
+        _, hit = await _run(cache, _prompt(5550, "68.40", steel_name="Aluminum Frame"), "inv-2")
+        return hit
+
+    assert not asyncio.run(scenario())
+
+
+def test_unparseable_requests_bypass_the_cache(cache):
+    prompt = "Analyze this: steel and plastic, mostly steel."
+    context = _context(prompt, "inv-1")
+    assert analyzer.before_model_callback(context, _request(prompt)) is None
+    assert analyzer.after_model_callback(context, _model_output("{}")) is None
+    assert not cache._entries
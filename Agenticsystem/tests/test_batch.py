@@ -0,0 +1,75 @@
+import asyncio
+import gc
+from types import SimpleNamespace
+
+from google.genai import types
+
+from pilot._batch import _BatchQueue
+
+
+def _queue(run_job, max_batch_size=10):
+    queue = _BatchQueue(SimpleNamespace(max_batch_size=max_batch_size, batch_window=0.01))
+    queue._run_job = run_job
+    return queue
+
+
+def _inlined(text):
+    return types.InlinedResponse(
+        response=types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.ModelContent(parts=[types.Part.from_text(text=text)]))]
+        )
+    )
+
+
+def test_requests_in_one_window_share_a_job_and_survive_gc():
+    jobs = []
+
+    async def run_job(requests):
+        jobs.append(len(requests))
+        # A collection here must not drop the running flush
+        gc.collect()
+        await asyncio.sleep(0.01)
+        gc.collect()
+        return [_inlined(f"answer {i}") for i in range(len(requests))]
+
+    async def scenario():
+        queue = _queue(run_job)
+        return await asyncio.wait_for(
+            asyncio.gather(*(queue.submit(types.InlinedRequest()) for _ in range(3))), timeout=5
+        )
+
+    responses = asyncio.run(scenario())
+    assert jobs == [3]
+    assert [response.text for response in responses] == ["answer 0", "answer 1", "answer 2"]
+
+
+def test_failed_job_fails_every_queued_request():
+    async def run_job(requests):
+        raise RuntimeError("quota exceeded")
+
+    async def scenario():
+        queue = _queue(run_job)
+        return await asyncio.wait_for(
+            asyncio.gather(*(queue.submit(types.InlinedRequest()) for _ in range(2)), return_exceptions=True),
+            timeout=5,
+        )
+
+    results = asyncio.run(scenario())
+    assert [str(result) for result in results] == ["quota exceeded", "quota exceeded"]
+
+
+def test_missing_responses_fail_the_remaining_requests():
+    async def run_job(requests):
+        return [_inlined("only one")]
+
+    async def scenario():
+        queue = _queue(run_job)
+        return await asyncio.wait_for(
+            asyncio.gather(*(queue.submit(types.InlinedRequest()) for _ in range(2)), return_exceptions=True),
+            timeout=5,
+        )
+
+    first, second = asyncio.run(scenario())
+    assert first.text == "only one"
+    assert isinstance(second, RuntimeError)
+    assert "no response" in str(second)
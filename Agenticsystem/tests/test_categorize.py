@@ -0,0 +1,86 @@
+import numpy as np
+
+from pilot._categorize import bucket, categorize, parse_rows
+
+PROMPT = """Please analyze the following carbon footprint data:
+
+PRODUCTS DATA:
+Product: Steel Frame
+- Material Type: Steel
+- Weight: 3000 kg
+- Emission Factor: 1.85 kg CO2e/kg
+- Total Emissions: 5,550 kg CO2e
+- Percentage of Total: 68.44%
+Product: Plastic Case
+- Material Type: Plastic
+- Emission Factor: 6.0 kg CO2e/kg
+- Total Emissions: n/a
+- Percentage of Total: 18.50%
+
+SUMMARY:
+- Total Products: 2
+- Percentage of Total: 100%
+"""
+
+
+def test_parse_rows_reads_labelled_fields_per_product():
+    rows = parse_rows(PROMPT)
+    assert rows == [
+        {
+            "product_name": "Steel Frame",
+            "material_type": "Steel",
+            "emission_factor": "1.85 kg CO2e/kg",
+            "absolute_emissions": "5,550 kg CO2e",
+            "emission_percentage": "68.44%",
+        },
+        {
+            "product_name": "Plastic Case",
+            "material_type": "Plastic",
+            "emission_factor": "6.0 kg CO2e/kg",
+            "absolute_emissions": "n/a",
+            "emission_percentage": "18.50%",
+        },
+    ]
+
+
+def test_parse_rows_ignores_text_without_products():
+    assert parse_rows("Analyze this: steel and plastic, mostly steel.") == []
+    # Field lines before any 'Product:' line belong to no row
+    assert parse_rows("- Material Type: Steel\n- Percentage of Total: 50%") == []
+
+
+def test_bucket_thresholds():
+    pct = np.array([40.01, 40.0, 15.0, 14.99, 0.0])
+    assert bucket(pct).tolist() == ["high", "medium", "medium", "low", "low"]
+
+
+def test_categorize_buckets_rows_and_reports_malformed_ones():
+    rows = parse_rows(PROMPT) + [
+        {"product_name": "Cotton T-Shirt", "emission_factor": "5.3",
+         "absolute_emissions": "1060", "emission_percentage": "13.07"},
+        {"product_name": "Glass Jar", "material_type": "Glass", "emission_factor": "0.9",
+         "absolute_emissions": "120", "emission_percentage": "1.5"},
+    ]
+    categorized = categorize(rows)
+
+    assert categorized["high_impact"] == [{
+        "product_name": "Steel Frame",
+        "material_type": "Steel",
+        "emission_factor": 1.85,
+        "absolute_emissions": 5550.0,
+        "emission_percentage": 68.44,
+    }]
+    assert categorized["medium_impact"] == []
+    assert [p["product_name"] for p in categorized["low_impact"]] == ["Glass Jar"]
+
+    errors = {item["product_name"]: item["error"] for item in categorized["unprocessed_items"]}
+    assert errors == {
+        "Plastic Case": "Missing or invalid: absolute_emissions",
+        "Cotton T-Shirt": "Missing or invalid: material_type",
+    }
+
+
+def test_categorize_without_rows():
+    assert categorize([]) == {
+        "high_impact": [], "medium_impact": [], "low_impact": [], "unprocessed_items": [],
+    }
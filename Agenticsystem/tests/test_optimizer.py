@@ -0,0 +1,128 @@
+import asyncio
+import json
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from pilot.subagents.optimizer_agent import agent as optimizer
+
+
+def _plan(product, strategy_type, actions, bucket="high_impact_recommendations", summary=""):
+    return {
+        "optimization_strategies": {
+            "high_impact_recommendations": [],
+            "medium_impact_recommendations": [],
+            bucket: [{
+                "product_name": product,
+                "current_material": "Steel",
+                "primary_issue": "High Volume",
+                "proposed_strategies": [{
+                    "strategy_type": strategy_type,
+                    "specific_actions": list(actions),
+                    "expected_outcome": "Lower emissions",
+                }],
+            }],
+        },
+        "strategic_summary": {"overall_recommendation": summary, "synergy_opportunities": ""},
+    }
+
+
+def _strategies(merged, bucket="high_impact_recommendations"):
+    return {
+        (recommendation["product_name"], strategy["strategy_type"]): strategy["specific_actions"]
+        for recommendation in merged["optimization_strategies"][bucket]
+        for strategy in recommendation["proposed_strategies"]
+    }
+
+
+def test_merge_groups_angles_per_product():
+    merged = optimizer.merge_plans([
+        _plan("Steel Frame", "Material Substitution", ["Use recycled steel"], summary="Substitute."),
+        json.dumps(_plan("Steel Frame", "Supplier Engagement", ["Green suppliers"], summary="Engage.")),
+    ])
+    recommendations = merged["optimization_strategies"]["high_impact_recommendations"]
+    assert [r["product_name"] for r in recommendations] == ["Steel Frame"]
+    assert _strategies(merged) == {
+        ("Steel Frame", "Material Substitution"): ["Use recycled steel"],
+        ("Steel Frame", "Supplier Engagement"): ["Green suppliers"],
+    }
+    assert merged["strategic_summary"]["overall_recommendation"] == "Substitute. Engage."
+
+
+def test_merge_concatenates_duplicate_strategies():
+    first = _plan("Steel Frame", "Material Substitution", ["Use recycled steel"])
+    second = _plan("Steel Frame", "Material Substitution", ["Switch to aluminum"])
+    merged = optimizer.merge_plans([first, second])
+    assert _strategies(merged) == {
+        ("Steel Frame", "Material Substitution"): ["Use recycled steel", "Switch to aluminum"],
+    }
+    # The inputs are not modified
+    assert first["optimization_strategies"]["high_impact_recommendations"][0][
+        "proposed_strategies"][0]["specific_actions"] == ["Use recycled steel"]
+
+
+def test_merge_skips_missing_and_unparseable_angles():
+    merged = optimizer.merge_plans([
+        None,
+        "not json",
+        _plan("Plastic Case", "Product Redesign", ["Thinner walls"], bucket="medium_impact_recommendations"),
+    ])
+    assert merged["optimization_strategies"]["high_impact_recommendations"] == []
+    assert _strategies(merged, "medium_impact_recommendations") == {
+        ("Plastic Case", "Product Redesign"): ["Thinner walls"],
+    }
+
+
+def test_merge_of_empty_angles_is_an_empty_valid_plan():
+    empty = {
+        "optimization_strategies": {"high_impact_recommendations": [], "medium_impact_recommendations": []},
+        "strategic_summary": {"overall_recommendation": "", "synergy_opportunities": ""},
+    }
+    merged = optimizer.merge_plans([empty, {}, None, None])
+    assert merged == empty
+    optimizer.OptimizationPlan.model_validate(merged)
+
+
+RESPONSES = {}
+
+
+class FakeLlm(BaseLlm):
+    """Answers with RESPONSES[agent name]; None produces an empty response."""
+
+    async def generate_content_async(self, llm_request, stream=False) -> AsyncGenerator[LlmResponse, None]:
+        text = RESPONSES.get(self.model)
+        if text is None:
+            yield LlmResponse()
+        else:
+            yield LlmResponse(content=types.ModelContent(parts=[types.Part.from_text(text=text)]))
+
+
+def test_rerun_does_not_merge_stale_angle_plans():
+    agent = optimizer._build.__wrapped__()
+    for prefix, strategy_type, _ in optimizer.ANGLES:
+        RESPONSES[f"{prefix}_agent"] = json.dumps(_plan("Steel Frame", strategy_type, [f"{prefix} action"]))
+    for angle_agent in agent.sub_agents[0].sub_agents:
+        angle_agent.model = FakeLlm(model=angle_agent.name)
+
+    runner = InMemoryRunner(agent=agent, app_name="test")
+    session = runner.session_service.create_session(app_name="test", user_id="u")
+
+    async def run():
+        message = types.UserContent(parts=[types.Part.from_text(text="{}")])
+        async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            pass
+        state = runner.session_service.get_session(
+            app_name="test", user_id="u", session_id=session.id
+        ).state
+        return _strategies(state["optimization_plan"])
+
+    assert len(asyncio.run(run())) == 4
+
+    # Second run in the same session: material substitution produces nothing
+    RESPONSES["material_substitution_agent"] = None
+    strategies = asyncio.run(run())
+    assert ("Steel Frame", "Material Substitution") not in strategies
+    assert len(strategies) == 3
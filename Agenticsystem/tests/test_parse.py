@@ -0,0 +1,40 @@
+import pytest
+
+from pilot._parse import JSONDecodeError, extract_object, parse
+
+
+def test_extract_object_skips_surrounding_prose():
+    text = 'Here is the plan: {"a": {"b": [1, {"c": 2}]}} and some notes {"d": 3}'
+    assert extract_object(text) == '{"a": {"b": [1, {"c": 2}]}}'
+
+
+def test_extract_object_ignores_braces_inside_strings():
+    obj = r'{"note": "use } and { freely", "quote": "a \"}\" b"}'
+    assert extract_object(f"prefix {obj} suffix") == obj
+    assert parse(extract_object(obj)) == {"note": "use } and { freely", "quote": 'a "}" b'}
+
+
+def test_extract_object_from_fenced_json():
+    text = 'Result:\n```json\n{"plan": {"steps": ["a", "b"]}}\n```\nDone.'
+    assert parse(extract_object(text)) == {"plan": {"steps": ["a", "b"]}}
+
+
+def test_extract_object_without_a_complete_object():
+    assert extract_object("no json here") is None
+    assert extract_object('truncated {"a": {"b": 1}') is None
+
+
+def test_parse_strips_code_fences():
+    assert parse('```json\n{"a": 1}\n```') == {"a": 1}
+    assert parse('  ```\n{"a": [1, 2]}\n```  ') == {"a": [1, 2]}
+    assert parse('{"a": "```"}') == {"a": "```"}
+
+
+def test_parse_returns_dicts_unchanged():
+    value = {"a": 1}
+    assert parse(value) is value
+
+
+def test_parse_rejects_invalid_json():
+    with pytest.raises(JSONDecodeError):
+        parse("```json\nnot json\n```")
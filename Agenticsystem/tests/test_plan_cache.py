@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from pilot._plan_cache import PlanTemplateCache, plan_signature
+
+ANGLE_AGENTS = (
+    "material_substitution_agent",
+    "supplier_engagement_agent",
+    "product_redesign_agent",
+    "process_improvement_agent",
+)
+
+ANALYSIS = {
+    "high_impact": [{"product_name": "Steel Frame", "material_type": "Steel"}],
+    "medium_impact": [{"product_name": "Plastic Case", "material_type": "Plastic"}],
+    "low_impact": [{"product_name": "Cotton T-Shirt", "material_type": "Cotton"}],
+}
+
+
+def _context(agent_name, invocation_id="inv-1"):
+    return SimpleNamespace(
+        invocation_id=invocation_id,
+        agent_name=agent_name,
+        state={"analysis_results": ANALYSIS},
+    )
+
+
+def _request():
+    return LlmRequest(config=types.GenerateContentConfig())
+
+
+def _response(text):
+    return LlmResponse(content=types.ModelContent(parts=[types.Part.from_text(text=text)]))
+
+
+def test_plan_signature_ignores_low_impact():
+    assert plan_signature(ANALYSIS) == (("Plastic", "medium_impact"), ("Steel", "high_impact"))
+
+
+def test_parallel_angles_sharing_an_invocation_id_keep_their_own_plans():
+    cache = PlanTemplateCache()
+    for agent_name in ANGLE_AGENTS:
+        cache.before_model_callback(_context(agent_name), _request())
+    # The parallel agents finish in a different order than they started
+    for agent_name in reversed(ANGLE_AGENTS):
+        cache.after_model_callback(_context(agent_name), _response(f"PLAN FROM {agent_name}"))
+
+    signature = plan_signature(ANALYSIS)
+    for agent_name in ANGLE_AGENTS:
+        assert cache.get((agent_name, signature)) == f"PLAN FROM {agent_name}"
+
+
+def test_cached_plan_is_attached_as_skeleton_to_the_same_angle_only():
+    cache = PlanTemplateCache()
+    cache.before_model_callback(_context(ANGLE_AGENTS[0]), _request())
+    cache.after_model_callback(_context(ANGLE_AGENTS[0]), _response("PLAN A"))
+
+    hit = _request()
+    cache.before_model_callback(_context(ANGLE_AGENTS[0], "inv-2"), hit)
+    assert "PLAN A" in hit.config.system_instruction
+
+    miss = _request()
+    cache.before_model_callback(_context(ANGLE_AGENTS[1], "inv-2"), miss)
+    assert not miss.config.system_instruction
+
+
+def test_partial_responses_are_not_cached():
+    cache = PlanTemplateCache()
+    cache.before_model_callback(_context(ANGLE_AGENTS[0]), _request())
+    partial = _response("PLAN")
+    partial.partial = True
+    cache.after_model_callback(_context(ANGLE_AGENTS[0]), partial)
+    assert cache.get((ANGLE_AGENTS[0], plan_signature(ANALYSIS))) is None
@@ -0,0 +1,91 @@
+import json
+import re
+
+import pytest
+
+import visualizer
+
+
+def _products(values):
+    return [
+        {"product_name": f"P{i}", "total_emissions": value, "percentage_of_total": value}
+        for i, value in enumerate(values)
+    ]
+
+
+def _analysis(low_impact):
+    return {
+        "impact_categories": {"high_impact": [], "medium_impact": [], "low_impact": low_impact},
+        "material_insights": {},
+        "top_emitters_ranking": [],
+        "analysis_summary": {"dominant_emitter": "P0 at 10%"},
+        "key_patterns": [],
+        "optimization_priorities": {"quick_wins": [], "strategic_targets": []},
+    }
+
+
+def _charts(html):
+    data = re.search(r'id="chart-data">\n(.*?)\n\s*</script>', html, re.S)[1]
+    charts = {}
+    for line in data.splitlines():
+        if line.strip():
+            record = json.loads(line)
+            if "trace" in record:
+                charts.setdefault(record["chart"], []).append(record["trace"])
+    return charts
+
+
+def test_split_top_keeps_small_inputs_unchanged():
+    products = _products([1, 3, 2])
+    top, rest = visualizer._split_top(products, "total_emissions", 3)
+    assert top is products
+    assert rest == []
+
+
+def test_split_top_takes_the_largest_in_descending_order():
+    products = _products([5, 1, 9, 3, 9, 7])
+    top, rest = visualizer._split_top(products, "total_emissions", 3)
+    # Ties keep their input order
+    assert [p["product_name"] for p in top] == ["P2", "P4", "P5"]
+    assert sorted(p["product_name"] for p in rest) == ["P0", "P1", "P3"]
+
+
+def test_report_groups_products_beyond_max_bars_into_other():
+    html = visualizer.create_detailed_report(_analysis(_products([4, 1, 3, 2, 5])), max_bars=2)
+    charts = _charts(html)
+
+    low, other = charts["chart1"]
+    # The bars keep the catalog order within their category
+    assert low["x"] == ["P0", "P4"]
+    assert other["x"] == ["Other (3 products)"]
+    assert other["y"] == [6]
+
+    pie, = charts["chart2"]
+    assert pie["labels"] == ["P4", "P0", "Other (3 products)"]
+    assert pie["values"] == [5, 4, 6]
+
+
+def test_report_without_other_bucket_at_max_bars():
+    charts = _charts(visualizer.create_detailed_report(_analysis(_products([1, 2])), max_bars=2))
+    assert [trace["name"] for trace in charts["chart1"]] == ["Low Impact"]
+    assert "Other" not in " ".join(charts["chart2"][0]["labels"])
+
+
+def test_failed_report_keeps_the_previous_file(tmp_path):
+    filename = tmp_path / "report.html"
+    visualizer.save_report(_analysis(_products([1, 2])), str(filename))
+    previous = filename.read_text()
+
+    broken = _analysis(_products([1, 2]))
+    del broken["analysis_summary"]
+    with pytest.raises(KeyError):
+        visualizer.save_report(broken, str(filename))
+    assert filename.read_text() == previous
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["plotly.min.js", "report.html"]
+
+
+def test_stale_plotlyjs_bundle_is_refreshed(tmp_path):
+    bundle = tmp_path / visualizer.PLOTLYJS_BUNDLE
+    bundle.write_text("/* plotly.js from an older release */")
+    visualizer.save_dashboard(_analysis(_products([1, 2])), str(tmp_path / "dashboard.html"))
+    assert bundle.read_bytes() == visualizer._plotlyjs_bytes()
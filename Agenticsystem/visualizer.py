@@ -17,312 +17,324 @@ Usage:
         f.write(report_html)
 """
 
-import json
+import functools
+import gzip
+import os
+import re
+import string
+import numpy as np
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.express as px
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+from pilot._parse import _loads
 
 
-def create_dashboard(analysis_json):
+def _subplot_title(text, x, y):
+    return {
+        'text': text,
+        'x': x,
+        'y': y,
+        'xref': 'paper',
+        'yref': 'paper',
+        'xanchor': 'center',
+        'yanchor': 'bottom',
+        'showarrow': False,
+        'font': {'size': 16}
+    }
+
+
+# Dashboard grid: the domains, axes and subplot titles make_subplots(rows=2, cols=2)
+# produces with a pie in the top right cell, precomputed once instead of per call
+PIE_DOMAIN = {'x': [0.55, 1.0], 'y': [0.625, 1.0]}
+
+DASHBOARD_LAYOUT = {
+    'xaxis': {'anchor': 'y', 'domain': [0.0, 0.45], 'title': {'text': 'Products'}},
+    'yaxis': {'anchor': 'x', 'domain': [0.625, 1.0], 'title': {'text': 'Emissions (kg CO2e)'}},
+    'xaxis2': {'anchor': 'y2', 'domain': [0.0, 0.45], 'title': {'text': 'Materials'}},
+    'yaxis2': {'anchor': 'x2', 'domain': [0.0, 0.375], 'title': {'text': 'Emission Factor (kg CO2e/kg)'}},
+    'xaxis3': {'anchor': 'y3', 'domain': [0.55, 1.0], 'title': {'text': 'Products'}},
+    'yaxis3': {'anchor': 'x3', 'domain': [0.0, 0.375], 'title': {'text': '% of Total Emissions'}},
+    'annotations': [
+        _subplot_title('Carbon Emissions by Product', 0.225, 1.0),
+        _subplot_title('Impact Category Distribution', 0.775, 1.0),
+        _subplot_title('Material Emission Factors', 0.225, 0.375),
+        _subplot_title('Top Emitters Ranking', 0.775, 0.375)
+    ],
+    'title': {'text': '🌱 Carbon Pilot - Analyzer Agent Output', 'font': {'size': 24}},
+    'showlegend': False,
+    'height': 800,
+    'template': pio.templates['plotly_white']
+}
+
+# Layouts of the three report charts, with titles and axis titles baked in
+EMISSIONS_LAYOUT = {
+    'title': {'text': 'Carbon Emissions by Product and Impact Category'},
+    'xaxis': {'title': {'text': 'Product'}},
+    'yaxis': {'title': {'text': 'Emissions (kg CO2e)'}},
+    'legend': {'title': {'text': 'Category'}, 'tracegroupgap': 0},
+    'barmode': 'relative',
+    'height': 500
+}
+
+CONTRIBUTION_LAYOUT = {
+    'title': {'text': 'Percentage Contribution to Total Emissions'},
+    'height': 500
+}
+
+MATERIALS_LAYOUT = {
+    'title': {'text': 'Material Emission Factors Comparison'},
+    'xaxis': {'title': {'text': 'Material Type'}},
+    'yaxis': {'title': {'text': 'Emission Factor (kg CO2e/kg)'}},
+    'height': 500
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_cached(analysis_text):
+    return _loads(analysis_text)
+
+
+def _ensure_dict(analysis_json):
     """
-    Create interactive dashboard from Analyzer Agent output
-    
-    Args:
-        analysis_json: The analysis_results output from analyzer_agent
-                      (can be dict or JSON string)
+    Return the analysis as a dict
     
-    Returns:
-        plotly.graph_objects.Figure: Interactive dashboard with multiple charts
+    JSON strings (or bytes) are parsed once, with orjson when available, and memoized, so the dashboard and the report
+    built from the same string share one parse. The result must not be mutated.
     """
-    
-    # Parse if string
-    if isinstance(analysis_json, str):
-        data = json.loads(analysis_json)
-    else:
-        data = analysis_json
-    
-    # Create subplots
-    fig = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=(
-            'Carbon Emissions by Product',
-            'Impact Category Distribution',
-            'Material Emission Factors',
-            'Top Emitters Ranking'
-        ),
-        specs=[
-            [{"type": "bar"}, {"type": "pie"}],
-            [{"type": "bar"}, {"type": "bar"}]
-        ]
-    )
-    
-    # 1. EMISSIONS BY PRODUCT (Bar Chart)
-    products = []
-    emissions = []
-    colors = []
-    
-    for product in data['impact_categories']['high_impact']:
-        products.append(product['product_name'])
-        emissions.append(product['total_emissions'])
-        colors.append('#ef4444')  # Red for high
-    
-    for product in data['impact_categories']['medium_impact']:
-        products.append(product['product_name'])
-        emissions.append(product['total_emissions'])
-        colors.append('#f59e0b')  # Orange for medium
-    
-    for product in data['impact_categories']['low_impact']:
-        products.append(product['product_name'])
-        emissions.append(product['total_emissions'])
-        colors.append('#22c55e')  # Green for low
-    
-    fig.add_trace(
-        go.Bar(
-            x=products,
-            y=emissions,
-            marker_color=colors,
-            name='Emissions',
-            text=[f'{e:,.0f} kg CO2e' for e in emissions],
-            textposition='outside'
-        ),
-        row=1, col=1
-    )
-    
-    # 2. IMPACT CATEGORY PIE CHART
-    categories = ['High Impact', 'Medium Impact', 'Low Impact']
-    counts = [
-        len(data['impact_categories']['high_impact']),
-        len(data['impact_categories']['medium_impact']),
-        len(data['impact_categories']['low_impact'])
-    ]
-    category_colors = ['#ef4444', '#f59e0b', '#22c55e']
-    
-    fig.add_trace(
-        go.Pie(
-            labels=categories,
-            values=counts,
-            marker_colors=category_colors,
-            hole=0.4,
-            textinfo='label+value'
-        ),
-        row=1, col=2
-    )
-    
-    # 3. MATERIAL EMISSION FACTORS
-    materials = []
-    factors = []
-    profiles = []
-    
-    for material, info in data['material_insights'].items():
-        materials.append(material)
-        factors.append(info['emission_factor'])
-        profiles.append(info['environmental_profile'])
-    
-    factor_colors = ['#22c55e' if 'Low' in p else '#f59e0b' if 'Medium' in p else '#ef4444' for p in profiles]
-    
-    fig.add_trace(
-        go.Bar(
-            x=materials,
-            y=factors,
-            marker_color=factor_colors,
-            name='Emission Factor',
-            text=[f'{f:.2f}' for f in factors],
-            textposition='outside'
-        ),
-        row=2, col=1
-    )
-    
-    # 4. TOP EMITTERS RANKING
-    rankers = [item['product_name'] for item in data['top_emitters_ranking']]
-    percentages = [item['percentage'] for item in data['top_emitters_ranking']]
-    
-    fig.add_trace(
-        go.Bar(
-            x=rankers,
-            y=percentages,
-            marker_color=['#ef4444', '#f59e0b', '#22c55e'][:len(rankers)],
-            name='% of Total',
-            text=[f'{p:.1f}%' for p in percentages],
-            textposition='outside'
-        ),
-        row=2, col=2
-    )
-    
-    # Update layout
-    fig.update_xaxes(title_text="Products", row=1, col=1)
-    fig.update_yaxes(title_text="Emissions (kg CO2e)", row=1, col=1)
-    
-    fig.update_xaxes(title_text="Materials", row=2, col=1)
-    fig.update_yaxes(title_text="Emission Factor (kg CO2e/kg)", row=2, col=1)
-    
-    fig.update_xaxes(title_text="Products", row=2, col=2)
-    fig.update_yaxes(title_text="% of Total Emissions", row=2, col=2)
-    
-    fig.update_layout(
-        title_text="🌱 Carbon Pilot - Analyzer Agent Output",
-        title_font_size=24,
-        showlegend=False,
-        height=800,
-        template="plotly_white"
-    )
-    
-    return fig
+    if isinstance(analysis_json, (str, bytes)):
+        return _parse_cached(analysis_json)
+    return analysis_json
+
+
+# (analysis key, label, color) per impact category: red for high, orange for medium, green for low
+_CATEGORIES = (
+    ('high_impact', 'High Impact', '#ef4444'),
+    ('medium_impact', 'Medium Impact', '#f59e0b'),
+    ('low_impact', 'Low Impact', '#22c55e')
+)
+
+# Static part of each dashboard trace; create_dashboard only fills in the data
+_EMISSIONS_TRACE = {
+    'type': 'bar',
+    'name': 'Emissions',
+    'texttemplate': '%{text:,.0f} kg CO2e',
+    'textposition': 'outside',
+    'xaxis': 'x',
+    'yaxis': 'y'
+}
+
+_CATEGORY_PIE = {
+    'type': 'pie',
+    'labels': [label for _, label, _ in _CATEGORIES],
+    'marker': {'colors': [color for _, _, color in _CATEGORIES]},
+    'hole': 0.4,
+    'textinfo': 'label+value',
+    'domain': PIE_DOMAIN
+}
 
+_FACTOR_TRACE = {
+    'type': 'bar',
+    'name': 'Emission Factor',
+    'texttemplate': '%{text:.2f}',
+    'textposition': 'outside',
+    'xaxis': 'x2',
+    'yaxis': 'y2'
+}
 
-def create_detailed_report(analysis_json):
+_RANKING_TRACE = {
+    'type': 'bar',
+    'name': '% of Total',
+    'texttemplate': '%{text:.1f}%',
+    'textposition': 'outside',
+    'xaxis': 'x3',
+    'yaxis': 'y3'
+}
+
+
+def _patch(shell, x, y, colors):
+    """Copy of a bar trace shell with its data filled in (values double as bar labels)."""
+    return {**shell, 'x': x, 'y': y, 'text': y, 'marker': {'color': colors}}
+
+
+# Color per environmental profile level ("Low carbon intensity" -> 'Low')
+_PROFILE_COLOR = {'Low': '#22c55e', 'Medium': '#f59e0b', 'High': '#ef4444'}
+_PROFILE_LEVEL_RE = re.compile(r'Low|Medium|High')
+
+
+def _profile_color(profile):
+    """Color for a material's environmental profile, red unless it is Low or Medium."""
+    level = profile.split(maxsplit=1)[0] if profile else ''
+    if level not in _PROFILE_COLOR:
+        # Level word is not first; fall back to a single scan of the string
+        match = _PROFILE_LEVEL_RE.search(profile or '')
+        level = match[0] if match else 'High'
+    return _PROFILE_COLOR[level]
+
+
+# Above this many bars a bar trace is drawn as one WebGL marker trace instead of
+# one SVG element per bar
+GL_THRESHOLD = 1000
+
+
+def _as_gl(trace):
+    """Turn a bar trace dict into a scattergl trace if it has more than GL_THRESHOLD bars."""
+    if len(trace['x']) <= GL_THRESHOLD:
+        return trace
+    gl_trace = {
+        key: value for key, value in trace.items()
+        if key not in ('texttemplate', 'textposition', 'offsetgroup', 'alignmentgroup')
+    }
+    gl_trace['type'] = 'scattergl'
+    gl_trace['mode'] = 'markers'
+    gl_trace['marker'] = {**trace['marker'], 'symbol': 'square', 'size': 8}
+    return gl_trace
+
+# Color of the aggregated "Other" entry in the report charts
+OTHER_COLOR = '#9ca3af'
+
+
+def _split_top(products, key, n):
     """
-    Create a detailed HTML report with multiple visualizations
-    
-    Args:
-        analysis_json: The analysis_results output from analyzer_agent
-                      (can be dict or JSON string)
+    Split products into the n largest by key and the remaining tail
     
-    Returns:
-        str: Complete HTML report with embedded visualizations
+    The input order is kept when there are at most n products.
     """
+    if len(products) <= n:
+        return products, []
+    # Partial selection of the n largest (O(N)), then sort only those n
+    values = -np.fromiter((p[key] for p in products), dtype=np.float64, count=len(products))
+    order = np.argpartition(values, n)
+    top = order[:n][np.argsort(values[order[:n]], kind='stable')]
+    return [products[i] for i in top], [products[i] for i in order[n:]]
+
+
+def _iter_chart_ndjson(charts):
+    """
+    Serialize (element id, figure) pairs as NDJSON lines for the report
     
-    if isinstance(analysis_json, str):
-        data = json.loads(analysis_json)
-    else:
-        data = analysis_json
-    
-    # Combine all products
-    all_products = (
-        data['impact_categories']['high_impact'] + 
-        data['impact_categories']['medium_impact'] + 
-        data['impact_categories']['low_impact']
-    )
-    
-    # Chart 1: Emissions Breakdown
-    emissions_data = {
-        'Product': [p['product_name'] for p in all_products],
-        'Emissions': [p['total_emissions'] for p in all_products],
-        'Percentage': [p['percentage_of_total'] for p in all_products],
-        'Category': (
-            ['High Impact'] * len(data['impact_categories']['high_impact']) +
-            ['Medium Impact'] * len(data['impact_categories']['medium_impact']) +
-            ['Low Impact'] * len(data['impact_categories']['low_impact'])
-        )
-    }
-    
-    fig1 = px.bar(
-        emissions_data,
-        x='Product',
-        y='Emissions',
-        color='Category',
-        color_discrete_map={
-            'High Impact': '#ef4444',
-            'Medium Impact': '#f59e0b',
-            'Low Impact': '#22c55e'
-        },
-        title='Carbon Emissions by Product and Impact Category',
-        labels={'Emissions': 'Emissions (kg CO2e)'},
-        text='Emissions'
-    )
-    fig1.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-    fig1.update_layout(height=500)
-    
-    # Chart 2: Percentage Contribution Pie
-    fig2 = go.Figure(data=[go.Pie(
-        labels=[p['product_name'] for p in all_products],
-        values=[p['percentage_of_total'] for p in all_products],
-        hole=0.3,
-        marker_colors=['#ef4444', '#f59e0b', '#22c55e']
-    )])
-    fig2.update_layout(
-        title='Percentage Contribution to Total Emissions',
-        height=500
-    )
-    
-    # Chart 3: Material Comparison
-    materials = list(data['material_insights'].keys())
-    emission_factors = [data['material_insights'][m]['emission_factor'] for m in materials]
-    
-    fig3 = go.Figure(data=[
-        go.Bar(
-            x=materials,
-            y=emission_factors,
-            marker_color=['#3b82f6', '#8b5cf6', '#ec4899'][:len(materials)],
-            text=[f'{ef:.2f}' for ef in emission_factors],
-            textposition='outside'
-        )
-    ])
-    fig3.update_layout(
-        title='Material Emission Factors Comparison',
-        xaxis_title='Material Type',
-        yaxis_title='Emission Factor (kg CO2e/kg)',
-        height=500
+    Each chart contributes one {"chart", "layout"} line followed by one
+    {"chart", "trace"} line per trace, so the page can draw each chart as soon
+    as its lines are parsed. '</' is escaped so the payload can sit inside a
+    <script> element.
+    """
+    for chart_id, fig in charts:
+        figure = fig.to_plotly_json()
+        records = [{'chart': chart_id, 'layout': figure['layout']}]
+        records.extend({'chart': chart_id, 'trace': trace} for trace in figure['data'])
+        for record in records:
+            yield pio.json.to_json_plotly(record).replace('</', '<\\/') + '\n'
+
+
+def _priority_items(items):
+    return ''.join(
+        f'<div class="insight-item"><strong>{item["product"]}</strong>: {item["reason"]}</div>'
+        for item in items
     )
+
+
+# plotly.js for the report: the CDN build by default, or a bundle saved next to
+# the HTML (the same file fig.write_html(include_plotlyjs='directory') uses)
+PLOTLYJS_CDN = "https://cdn.plot.ly/plotly-latest.min.js"
+PLOTLYJS_BUNDLE = "plotly.min.js"
+
+
+@functools.cache
+def _plotlyjs_bytes():
+    """The plotly.js bundle of the installed plotly, encoded once."""
+    return get_plotlyjs().encode("utf-8")
+
+
+def _write_plotlyjs(directory):
+    """
+    Write the plotly.js bundle of the installed plotly into directory
     
-    # Generate HTML
-    html_content = f"""
+    An existing bundle is kept only if it has the same size as the installed one,
+    so a bundle left by an older plotly is refreshed after an upgrade.
+    """
+    path = os.path.join(directory, PLOTLYJS_BUNDLE)
+    bundle = _plotlyjs_bytes()
+    try:
+        if os.path.getsize(path) == len(bundle):
+            return
+    except OSError:
+        pass
+    # The dashboard and report may be saved concurrently; replace atomically
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(bundle)
+    os.replace(tmp_path, path)
+
+
+# Static page of the detailed report up to the chart data, compiled once; the
+# per-report values are substituted into the $placeholders
+_REPORT_HEAD = string.Template("""
     <!DOCTYPE html>
     <html>
     <head>
         <title>Carbon Analyzer Agent - Visual Report</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+        <script src="$plotlyjs_src"></script>
         <style>
-            body {{
+            body {
                 font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                 margin: 0;
                 padding: 20px;
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            }}
-            .container {{
+            }
+            .container {
                 max-width: 1400px;
                 margin: 0 auto;
                 background: white;
                 padding: 40px;
                 border-radius: 20px;
                 box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            }}
-            h1 {{
+            }
+            h1 {
                 color: #1f2937;
                 text-align: center;
                 margin-bottom: 10px;
-            }}
-            .subtitle {{
+            }
+            .subtitle {
                 text-align: center;
                 color: #6b7280;
                 margin-bottom: 40px;
-            }}
-            .summary-box {{
+            }
+            .summary-box {
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 color: white;
                 padding: 30px;
                 border-radius: 15px;
                 margin-bottom: 40px;
-            }}
-            .summary-grid {{
+            }
+            .summary-grid {
                 display: grid;
                 grid-template-columns: repeat(3, 1fr);
                 gap: 20px;
                 margin-top: 20px;
-            }}
-            .summary-item {{
+            }
+            .summary-item {
                 text-align: center;
-            }}
-            .summary-number {{
+            }
+            .summary-number {
                 font-size: 36px;
                 font-weight: bold;
-            }}
-            .summary-label {{
+            }
+            .summary-label {
                 font-size: 14px;
                 opacity: 0.9;
-            }}
-            .insights-box {{
+            }
+            .insights-box {
                 background: #f3f4f6;
                 padding: 25px;
                 border-radius: 15px;
                 margin: 30px 0;
-            }}
-            .insight-item {{
+            }
+            .insight-item {
                 padding: 12px;
                 margin: 10px 0;
                 background: white;
                 border-left: 4px solid #667eea;
                 border-radius: 5px;
-            }}
+            }
         </style>
     </head>
     <body>
@@ -334,15 +346,15 @@ def create_detailed_report(analysis_json):
                 <h2 style="margin-top:0;">Analysis Summary</h2>
                 <div class="summary-grid">
                     <div class="summary-item">
-                        <div class="summary-number">{data['analysis_summary']['dominant_emitter'].split()[0]}</div>
+                        <div class="summary-number">$dominant_emitter</div>
                         <div class="summary-label">Dominant Emitter</div>
                     </div>
                     <div class="summary-item">
-                        <div class="summary-number">{data['analysis_summary']['dominant_emitter'].split()[-1]}</div>
+                        <div class="summary-number">$contribution</div>
                         <div class="summary-label">Contribution</div>
                     </div>
                     <div class="summary-item">
-                        <div class="summary-number">{len(all_products)}</div>
+                        <div class="summary-number">$product_count</div>
                         <div class="summary-label">Products Analyzed</div>
                     </div>
                 </div>
@@ -354,59 +366,351 @@ def create_detailed_report(analysis_json):
             
             <div class="insights-box">
                 <h2>🔍 Key Patterns Identified</h2>
-                {''.join([f'<div class="insight-item">• {pattern}</div>' for pattern in data['key_patterns']])}
+                $patterns_html
             </div>
             
             <div class="insights-box">
                 <h2>🎯 Optimization Priorities</h2>
                 <h3>Quick Wins:</h3>
-                {''.join([f'<div class="insight-item"><strong>{item["product"]}</strong>: {item["reason"]}</div>' for item in data['optimization_priorities']['quick_wins']])}
+                $quick_wins_html
                 
                 <h3>Strategic Targets:</h3>
-                {''.join([f'<div class="insight-item"><strong>{item["product"]}</strong>: {item["reason"]}</div>' for item in data['optimization_priorities']['strategic_targets']])}
+                $strategic_targets_html
             </div>
         </div>
         
+        <script type="application/x-ndjson" id="chart-data">
+""")
+
+# Rest of the page, after the chart data
+_REPORT_TAIL = """        </script>
+
         <script>
-            var chart1_data = {fig1.to_json()};
-            Plotly.newPlot('chart1', chart1_data.data, chart1_data.layout);
-            
-            var chart2_data = {fig2.to_json()};
-            Plotly.newPlot('chart2', chart2_data.data, chart2_data.layout);
-            
-            var chart3_data = {fig3.to_json()};
-            Plotly.newPlot('chart3', chart3_data.data, chart3_data.layout);
+            // One JSON record per line: a chart's layout, then each of its traces.
+            // Each chart is drawn with a single Plotly.react as soon as its lines are
+            // parsed, and the browser paints it before the next chart is parsed
+            document.addEventListener('DOMContentLoaded', function() {
+                var lines = document.getElementById('chart-data').textContent.split('\\n');
+                var i = 0;
+                function nextRecord() {
+                    while (i < lines.length) {
+                        var line = lines[i++];
+                        if (line.trim()) return JSON.parse(line);
+                    }
+                    return null;
+                }
+                var record = nextRecord();
+                function drawNextChart() {
+                    if (!record) return;
+                    var id = record.chart, layout = record.layout, traces = [];
+                    while ((record = nextRecord()) && !record.layout) {
+                        traces.push(record.trace);
+                    }
+                    Plotly.react(id, traces, layout, {responsive: true});
+                    requestAnimationFrame(function() { setTimeout(drawNextChart, 0); });
+                }
+                drawNextChart();
+            });
         </script>
     </body>
     </html>
     """
+
+
+def _dashboard_traces(data):
+    """The four dashboard traces (emissions, categories, factors, ranking) as plain dicts."""
+    # 1. EMISSIONS BY PRODUCT (Bar Chart)
+    impact_categories = data['impact_categories']
+    rows = [
+        (product['product_name'], product['total_emissions'], color)
+        for key, _, color in _CATEGORIES
+        for product in impact_categories[key]
+    ]
+    products, emissions, colors = map(list, zip(*rows)) if rows else ([], [], [])
+    
+    traces = [_patch(_EMISSIONS_TRACE, products, emissions, colors)]
+    
+    # 2. IMPACT CATEGORY PIE CHART
+    traces.append({
+        **_CATEGORY_PIE,
+        'values': [len(impact_categories[key]) for key, _, _ in _CATEGORIES]
+    })
+    
+    # 3. MATERIAL EMISSION FACTORS
+    material_rows = [
+        (material, info['emission_factor'], _profile_color(info['environmental_profile']))
+        for material, info in data['material_insights'].items()
+    ]
+    materials, factors, factor_colors = map(list, zip(*material_rows)) if material_rows else ([], [], [])
+    
+    traces.append(_patch(_FACTOR_TRACE, materials, factors, factor_colors))
+    
+    # 4. TOP EMITTERS RANKING
+    ranking = data['top_emitters_ranking']
+    rankers = [item['product_name'] for item in ranking]
+    percentages = [item['percentage'] for item in ranking]
+    
+    traces.append(_patch(
+        _RANKING_TRACE, rankers, percentages, ['#ef4444', '#f59e0b', '#22c55e'][:len(rankers)]
+    ))
     
-    return html_content
+    return traces
+
+
+def create_dashboard(analysis_json):
+    """
+    Create interactive dashboard from Analyzer Agent output
+    
+    Args:
+        analysis_json: The analysis_results output from analyzer_agent
+                      (can be dict or JSON string)
+    
+    Returns:
+        plotly.graph_objects.Figure: Interactive dashboard with multiple charts
+    """
+    
+    # Parse if string
+    data = _ensure_dict(analysis_json)
+    
+    emissions, categories, factors, ranking = _dashboard_traces(data)
+    traces = [_as_gl(emissions), categories, _as_gl(factors), ranking]
+    
+    # Traces are plain dicts patched from the shells and the layout is prebuilt,
+    # so skip plotly's validation
+    fig = go.Figure(data=traces, layout=DASHBOARD_LAYOUT, _validate=False)
+    
+    return fig
+
+
+def create_detailed_report(analysis_json, max_bars=200, plotlyjs_src=PLOTLYJS_CDN):
+    """
+    Create a detailed HTML report with multiple visualizations
+    
+    Args:
+        analysis_json: The analysis_results output from analyzer_agent
+                      (can be dict or JSON string)
+        max_bars: Maximum number of products drawn individually in the
+                  emissions and contribution charts; smaller ones are
+                  combined into a single "Other" entry
+        plotlyjs_src: URL or relative path the page loads plotly.js from
+    
+    Returns:
+        str: Complete HTML report with embedded visualizations
+    """
+    
+    return ''.join(_iter_report(_ensure_dict(analysis_json), max_bars, plotlyjs_src))
+
+
+def _iter_report(data, max_bars=200, plotlyjs_src=PLOTLYJS_CDN):
+    """
+    Generate the detailed report HTML in chunks
+    
+    Yields the page head, then one NDJSON line per chart layout and trace, then
+    the rest of the page, so save_report can write it out without holding the
+    whole document in memory.
+    """
+    
+    
+    # Combine all products
+    impact_categories = data['impact_categories']
+    all_products = [
+        product for key, _, _ in _CATEGORIES for product in impact_categories[key]
+    ]
+    
+    # Chart 1: Emissions Breakdown (one bar trace per impact category)
+    # Traces are plain dicts and the figures skip plotly's validation
+    top_emitters, other_emitters = _split_top(all_products, 'total_emissions', max_bars)
+    shown = {id(p) for p in top_emitters}
+    
+    fig1_traces = []
+    for key, category, color in _CATEGORIES:
+        products = impact_categories[key]
+        if other_emitters:
+            products = [p for p in products if id(p) in shown]
+        if not products:
+            continue
+        emissions = [p['total_emissions'] for p in products]
+        fig1_traces.append(_as_gl({
+            'type': 'bar',
+            'name': category,
+            'legendgroup': category,
+            'offsetgroup': category,
+            'alignmentgroup': 'True',
+            'x': [p['product_name'] for p in products],
+            'y': emissions,
+            'text': emissions,
+            'texttemplate': '%{text:,.0f}',
+            'textposition': 'outside',
+            'marker': {'color': color},
+            'hovertemplate': f'Category={category}<br>Product=%{{x}}<br>Emissions (kg CO2e)=%{{text}}<extra></extra>'
+        }))
+    
+    if other_emitters:
+        other_total = sum(p['total_emissions'] for p in other_emitters)
+        fig1_traces.append({
+            'type': 'bar',
+            'name': 'Other',
+            'x': [f'Other ({len(other_emitters)} products)'],
+            'y': [other_total],
+            'text': [other_total],
+            'texttemplate': '%{text:,.0f}',
+            'textposition': 'outside',
+            'marker': {'color': OTHER_COLOR}
+        })
+    
+    fig1 = go.Figure(data=fig1_traces, layout=EMISSIONS_LAYOUT, _validate=False)
+    
+    # Chart 2: Percentage Contribution Pie
+    top_shares, other_shares = _split_top(all_products, 'percentage_of_total', max_bars)
+    labels = [p['product_name'] for p in top_shares]
+    values = [p['percentage_of_total'] for p in top_shares]
+    if other_shares:
+        labels.append(f'Other ({len(other_shares)} products)')
+        values.append(sum(p['percentage_of_total'] for p in other_shares))
+    
+    fig2 = go.Figure(data=[{
+        'type': 'pie',
+        'labels': labels,
+        'values': values,
+        'hole': 0.3,
+        'marker': {'colors': ['#ef4444', '#f59e0b', '#22c55e']}
+    }], layout=CONTRIBUTION_LAYOUT, _validate=False)
+    
+    # Chart 3: Material Comparison
+    material_rows = [
+        (material, info['emission_factor']) for material, info in data['material_insights'].items()
+    ]
+    materials, emission_factors = map(list, zip(*material_rows)) if material_rows else ([], [])
+    
+    fig3 = go.Figure(data=[{
+        'type': 'bar',
+        'x': materials,
+        'y': emission_factors,
+        'marker': {'color': ['#3b82f6', '#8b5cf6', '#ec4899'][:len(materials)]},
+        'text': emission_factors,
+        'texttemplate': '%{text:.2f}',
+        'textposition': 'outside'
+    }], layout=MATERIALS_LAYOUT, _validate=False)
+    
+    # Generate HTML
+    dominant_emitter = data['analysis_summary']['dominant_emitter'].split()
+    priorities = data['optimization_priorities']
+    yield _REPORT_HEAD.substitute(
+        plotlyjs_src=plotlyjs_src,
+        dominant_emitter=dominant_emitter[0],
+        contribution=dominant_emitter[-1],
+        product_count=len(all_products),
+        patterns_html=''.join(f'<div class="insight-item">• {pattern}</div>' for pattern in data['key_patterns']),
+        quick_wins_html=_priority_items(priorities['quick_wins']),
+        strategic_targets_html=_priority_items(priorities['strategic_targets'])
+    )
+    yield from _iter_chart_ndjson((('chart1', fig1), ('chart2', fig2), ('chart3', fig3)))
+    yield _REPORT_TAIL
 
 
 def save_dashboard(analysis_results, filename="analyzer_dashboard.html"):
     """
     Convenience function to create and save dashboard
     
+    Writes two files: the HTML, and the plotly.js bundle it loads as
+    'plotly.min.js' from the same directory (instead of inlining ~3MB). Keep them
+    together when moving or sharing the dashboard.
+    
     Args:
         analysis_results: Output from analyzer agent
         filename: Output HTML filename
     """
-    fig = create_dashboard(analysis_results)
-    fig.write_html(filename)
+    fig = create_dashboard(_ensure_dict(analysis_results))
+    # write_html only writes plotly.min.js when it is missing; refresh a stale one first
+    _write_plotlyjs(os.path.dirname(os.path.abspath(filename)))
+    fig.write_html(filename, include_plotlyjs='directory')
     print(f"✅ Dashboard saved as '{filename}'")
     return fig
 
 
-def save_report(analysis_results, filename="analyzer_report.html"):
+def save_report(analysis_results, filename="analyzer_report.html", compress=False):
     """
     Convenience function to create and save detailed report
     
+    Like save_dashboard, also writes the 'plotly.min.js' bundle the report loads
+    from its directory.
+    
     Args:
         analysis_results: Output from analyzer agent
-        filename: Output HTML filename
+        filename: Output HTML filename; a name ending in '.gz' is written gzip-compressed
+        compress: Write a gzip-compressed report, appending '.gz' to filename
+                  if it lacks it. Serve it with 'Content-Encoding: gzip'
+                  (and 'Content-Type: text/html') so browsers decompress it
     """
-    html_report = create_detailed_report(analysis_results)
-    with open(filename, "w") as f:
-        f.write(html_report)
+    if compress and not filename.endswith('.gz'):
+        filename += '.gz'
+    # Self-host plotly.js next to the report instead of fetching it from the CDN
+    _write_plotlyjs(os.path.dirname(os.path.abspath(filename)))
+    # Write to a temporary file next to the report and replace it only once the
+    # whole report is generated, so a failure leaves the previous report intact
+    tmp_path = f"{filename}.{os.getpid()}.tmp"
+    if filename.endswith('.gz'):
+        f = gzip.open(tmp_path, "wt", compresslevel=6, encoding="utf-8")
+    else:
+        f = open(tmp_path, "w")
+    try:
+        # Write the report chunk by chunk as it is generated
+        with f:
+            f.writelines(_iter_report(_ensure_dict(analysis_results), plotlyjs_src=PLOTLYJS_BUNDLE))
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
     print(f"✅ Report saved as '{filename}'")
+
+
+def save_dashboard_png(analysis_results, filename="analyzer_dashboard.png", dpi=100):
+    """
+    Save a static PNG of the dashboard, drawn with Matplotlib
+    
+    fig.write_image goes through Kaleido, which starts a headless Chromium per
+    export; the same four panels are drawn here on a Matplotlib Figure rendered by
+    the Agg backend, which is much faster for batch exports. Requires matplotlib.
+    
+    Args:
+        analysis_results: Output from analyzer agent
+        filename: Output PNG filename
+        dpi: Resolution of the image
+    """
+    # Imported lazily: matplotlib is only needed for static exports. A bare Figure
+    # (no pyplot) renders with Agg and leaves the global backend alone
+    from matplotlib.figure import Figure
+    
+    emissions, categories, factors, ranking = _dashboard_traces(_ensure_dict(analysis_results))
+    
+    fig = Figure(figsize=(14, 8), layout='constrained')
+    (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
+    
+    bar_panels = (
+        (ax1, emissions, 'xaxis', 'yaxis', '{:,.0f} kg CO2e'),
+        (ax3, factors, 'xaxis2', 'yaxis2', '{:.2f}'),
+        (ax4, ranking, 'xaxis3', 'yaxis3', '{:.1f}%')
+    )
+    for ax, trace, xaxis, yaxis, label_format in bar_panels:
+        bars = ax.bar(trace['x'], trace['y'], color=trace['marker']['color'])
+        ax.bar_label(bars, labels=[label_format.format(value) for value in trace['y']])
+        ax.set_xlabel(DASHBOARD_LAYOUT[xaxis]['title']['text'])
+        ax.set_ylabel(DASHBOARD_LAYOUT[yaxis]['title']['text'])
+        ax.tick_params(axis='x', labelrotation=30)
+    
+    if any(categories['values']):
+        ax2.pie(
+            categories['values'],
+            labels=[f"{label} {value}" for label, value in zip(categories['labels'], categories['values'])],
+            colors=categories['marker']['colors'],
+            wedgeprops={'width': 1 - categories['hole']},
+            startangle=90,
+            counterclock=False
+        )
+    
+    for ax, annotation in zip((ax1, ax2, ax3, ax4), DASHBOARD_LAYOUT['annotations']):
+        ax.set_title(annotation['text'])
+    fig.suptitle('Carbon Pilot - Analyzer Agent Output', fontsize=24)
+    
+    fig.savefig(filename, dpi=dpi)
+    print(f"✅ Dashboard image saved as '{filename}'")